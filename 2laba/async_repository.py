@@ -0,0 +1,113 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class AsyncClientRepository:
+    def __init__(self, repo, workers=1):
+        # синхронный репозиторий выполняется в пуле потоков, цикл событий не блокируется;
+        # для файловых хранилищ один поток, чтобы операции не пересекались
+        self.repo = repo
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def _call(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(method, *args, **kwargs))
+
+    async def get_by_id(self, client_id: int):
+        return await self._call(self.repo.get_by_id, client_id)
+
+    async def get_by_phone(self, phone: str):
+        return await self._call(self.repo.get_by_phone, phone)
+
+    async def get_by_email(self, email: str):
+        return await self._call(self.repo.get_by_email, email)
+
+    async def get_by_license(self, driver_license: str):
+        return await self._call(self.repo.get_by_license, driver_license)
+
+    async def search(self, query: str, limit=10):
+        return await self._call(self.repo.search, query, limit)
+
+    async def get_k_n_short_list(self, n: int, k: int):
+        return await self._call(self.repo.get_k_n_short_list, n, k)
+
+    async def get_sorted_page(self, field="last_name", page=1, size=10, reverse=False):
+        return await self._call(self.repo.get_sorted_page, field, page, size, reverse)
+
+    async def sort_by_field(self, field="last_name", reverse=False):
+        return await self._call(self.repo.sort_by_field, field, reverse)
+
+    async def add_client(self, client_data: dict):
+        return await self._call(self.repo.add_client, client_data)
+
+    async def replace_by_id(self, client_id: int, new_data: dict):
+        return await self._call(self.repo.replace_by_id, client_id, new_data)
+
+    async def delete_by_id(self, client_id: int):
+        return await self._call(self.repo.delete_by_id, client_id)
+
+    async def get_count(self):
+        return await self._call(self.repo.get_count)
+
+    async def close(self):
+        close = getattr(self.repo, "close", None)
+        if close is not None:
+            await self._call(close)
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class AsyncClientRepFile(AsyncClientRepository):
+    def __init__(self, repo):
+        super().__init__(repo, workers=1)
+
+    @classmethod
+    async def open(cls, repo_class, filename: str, **kwargs):
+        loop = asyncio.get_running_loop()
+        repo = await loop.run_in_executor(None, partial(repo_class, filename, **kwargs))
+        return cls(repo)
+
+    async def compact(self):
+        return await self._call(self.repo.compact)
+
+
+class AsyncClientRepDB(AsyncClientRepository):
+    def __init__(self, repo):
+        # соединения берутся из пула ClientRepDB, потоков столько же, сколько соединений
+        super().__init__(repo, workers=repo.max_connections)
+
+    @classmethod
+    async def open(cls, **kwargs):
+        from client_rep_db import ClientRepDB
+
+        loop = asyncio.get_running_loop()
+        repo = await loop.run_in_executor(None, partial(ClientRepDB, **kwargs))
+        return cls(repo)
+
+    async def get_page_after(self, size=10, field="client_id", after_id=None, token=None, reverse=False):
+        return await self._call(self.repo.get_page_after, size, field, after_id, token, reverse)
+
+    async def add_clients_bulk(self, records, batch_size=1000):
+        return await self._call(self.repo.add_clients_bulk, records, batch_size)
+
+
+if __name__ == "__main__":
+    from client_rep_json import Client_rep_json
+
+    async def main():
+        async with await AsyncClientRepFile.open(Client_rep_json, "clients.json") as repo:
+            print("Количество клиентов:", await repo.get_count())
+            clients = await asyncio.gather(*(repo.get_by_id(i) for i in range(1, 4)))
+            for client in clients:
+                print(client)
+            print("Первая страница по фамилии:")
+            for short in await repo.get_sorted_page("last_name", 1, 5):
+                print(short)
+
+    asyncio.run(main())
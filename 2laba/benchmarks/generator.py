@@ -0,0 +1,86 @@
+import json
+import random
+
+from client import Client
+
+
+# фамилии и отчества в мужской и женской форме, выбор пола и имён детерминирован номером клиента
+LAST_NAMES = [
+    ("Иванов", "Иванова"), ("Петров", "Петрова"), ("Сидоров", "Сидорова"), ("Смирнов", "Смирнова"),
+    ("Кузнецов", "Кузнецова"), ("Попов", "Попова"), ("Васильев", "Васильева"), ("Соколов", "Соколова"),
+    ("Михайлов", "Михайлова"), ("Новиков", "Новикова"), ("Федоров", "Федорова"), ("Морозов", "Морозова"),
+    ("Волков", "Волкова"), ("Алексеев", "Алексеева"), ("Лебедев", "Лебедева"), ("Семенов", "Семенова"),
+    ("Егоров", "Егорова"), ("Павлов", "Павлова"), ("Козлов", "Козлова"), ("Степанов", "Степанова"),
+    ("Николаев", "Николаева"), ("Орлов", "Орлова"), ("Андреев", "Андреева"), ("Макаров", "Макарова"),
+]
+MALE_NAMES = ["Иван", "Петр", "Алексей", "Сергей", "Андрей", "Дмитрий", "Михаил", "Павел", "Николай",
+              "Александр", "Владимир", "Егор", "Максим", "Артем", "Кирилл", "Роман"]
+FEMALE_NAMES = ["Анна", "Мария", "Елена", "Ольга", "Татьяна", "Наталья", "Ирина", "Светлана", "Екатерина",
+                "Юлия", "Дарья", "Ксения", "Полина", "Алина", "Вера", "Софья"]
+OTCHS = [("Иванович", "Ивановна"), ("Петрович", "Петровна"), ("Сергеевич", "Сергеевна"),
+         ("Андреевич", "Андреевна"), ("Николаевич", "Николаевна"), ("Александрович", "Александровна"),
+         ("Дмитриевич", "Дмитриевна"), ("Михайлович", "Михайловна")]
+CITIES = ["Москва", "Санкт-Петербург", "Краснодар", "Казань", "Новосибирск", "Екатеринбург", "Сочи", "Самара"]
+STREETS = ["Ленина", "Мира", "Гагарина", "Пушкина", "Советская", "Садовая", "Лесная", "Школьная"]
+EMAIL_DOMAINS = ["mail.ru", "yandex.ru", "gmail.com", "example.com"]
+
+TRANSLIT = dict(zip(
+    "абвгдеёжзийклмнопрстуфхцчшщъыьэюя",
+    ["a", "b", "v", "g", "d", "e", "e", "zh", "z", "i", "y", "k", "l", "m", "n", "o", "p", "r", "s", "t",
+     "u", "f", "kh", "ts", "ch", "sh", "sch", "", "y", "", "e", "yu", "ya"]
+))
+
+
+def translit(text: str):
+    return "".join(TRANSLIT.get(ch, ch) for ch in text.lower())
+
+
+def make_client_data(i: int, rng=None):
+    # телефон и удостоверение - взаимно однозначные перестановки номера,
+    # поэтому до 10^9 клиентов они уникальны и проходят ограничения UNIQUE в базе
+    rng = rng or random.Random(i)
+    female = rng.random() < 0.5
+    last_name = rng.choice(LAST_NAMES)[female]
+    first_name = rng.choice(FEMALE_NAMES if female else MALE_NAMES)
+    otch = rng.choice(OTCHS)[female] if rng.random() < 0.9 else None
+    email = None
+    if rng.random() < 0.7:
+        email = f"{translit(first_name)}.{translit(last_name)}{i}@{rng.choice(EMAIL_DOMAINS)}"
+    return {
+        "client_id": i,
+        "last_name": last_name,
+        "first_name": first_name,
+        "otch": otch,
+        "address": f"г. {rng.choice(CITIES)}, ул. {rng.choice(STREETS)}, д. {rng.randint(1, 200)}, "
+                   f"кв. {rng.randint(1, 300)}",
+        "phone": f"+79{i * 7919 % 10 ** 9:09d}",
+        "email": email,
+        "driver_license": f"{i * 104729 % 10 ** 10:010d}"
+    }
+
+
+def generate_client_data(n: int, start=1, seed=0):
+    rng = random.Random(seed)
+    for i in range(start, start + n):
+        yield make_client_data(i, rng)
+
+
+def generate_clients(n: int, start=1, seed=0):
+    clients, errors = Client.validate_many(generate_client_data(n, start, seed))
+    if errors:
+        raise ValueError(f"Сгенерированы некорректные клиенты: {errors[:3]}")
+    return clients
+
+
+def new_client_records(n: int, start: int, seed=0):
+    records = []
+    for data in generate_client_data(n, start, seed):
+        del data["client_id"]
+        records.append(data)
+    return records
+
+
+def write_json_file(filename: str, n: int, seed=0):
+    data = list(generate_client_data(n, seed=seed))
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
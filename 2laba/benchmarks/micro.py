@@ -0,0 +1,687 @@
+import asyncio
+import copy
+import gc
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.generator import make_client_data, write_json_file
+from client import Client
+from client_rep_json import Client_rep_json
+
+
+def bench_get_by_id(sizes=(1000, 10000, 100000), lookups=10000):
+    print("get_by_id: задержка поиска в зависимости от размера файла")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            filename = os.path.join(tmp, f"clients_{n}.json")
+            write_json_file(filename, n)
+            repo = Client_rep_json(filename)
+
+            ids = [random.randint(1, n) for _ in range(lookups)]
+            start = time.perf_counter()
+            for client_id in ids:
+                repo.get_by_id(client_id)
+            elapsed = time.perf_counter() - start
+
+            print(f"   N={n:>8}: {elapsed / lookups * 1e6:8.3f} мкс на поиск")
+
+
+def bench_journal(sizes=(1000, 10000, 20000), writes=100):
+    print("add_client: стоимость записи с журналом и без")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            for journal in (False, True):
+                filename = os.path.join(tmp, f"clients_{n}_{journal}.json")
+                write_json_file(filename, n)
+                repo = Client_rep_json(filename, journal=journal, compact_every=writes + 1)
+
+                start = time.perf_counter()
+                for i in range(writes):
+                    data = make_client_data(n + i + 1)
+                    del data["client_id"]
+                    repo.add_client(data)
+                elapsed = time.perf_counter() - start
+
+                mode = "журнал" if journal else "перезапись"
+                print(f"   N={n:>8} {mode:>10}: {elapsed / writes * 1e3:8.3f} мс на запись")
+
+
+def bench_lazy_load(sizes=(10000, 100000)):
+    print("Загрузка JSON: обычная и ленивая (время и пик памяти)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            filename = os.path.join(tmp, f"clients_{n}.json")
+            write_json_file(filename, n)
+            for lazy in (False, True):
+                start = time.perf_counter()
+                Client_rep_json(filename, lazy=lazy)
+                elapsed = time.perf_counter() - start
+
+                tracemalloc.start()
+                repo = Client_rep_json(filename, lazy=lazy)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                mode = "ленивая" if lazy else "обычная"
+                print(f"   N={n:>8} {mode:>8}: {elapsed * 1e3:9.1f} мс, пик {peak / 2 ** 20:7.1f} МБ")
+                del repo
+
+
+class _LegacyClient:
+    # раскладка до __slots__: атрибуты в __dict__, contact хранится отдельно
+    def __init__(self, c):
+        self._client_id = c.client_id
+        self._last_name = c.last_name
+        self._first_name = c.first_name
+        self._otch = c.otch
+        self._contact = c.contact
+        self.address = c.address
+        self.phone = c.phone
+        self.email = c.email
+        self.driver_license = c.driver_license
+
+
+def bench_client_memory(n=100000):
+    print("Память на один объект Client (без учёта строк): __dict__ против __slots__")
+    clients = [Client(**make_client_data(i)) for i in range(1, n + 1)]
+    layouts = [
+        ("__dict__", _LegacyClient),
+        ("__slots__", copy.copy),
+    ]
+    for name, factory in layouts:
+        tracemalloc.start()
+        objects = [factory(c) for c in clients]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"   {name:>10}: {size / n:7.1f} байт на клиента")
+        del objects
+
+
+def bench_validation(n=100000):
+    print("Валидация: конструктор Client против Client.validate_many")
+    rows = [make_client_data(i) for i in range(1, n + 1)]
+
+    start = time.perf_counter()
+    clients = [Client(**data) for data in rows]
+    single = time.perf_counter() - start
+    del clients
+    gc.collect()
+
+    start = time.perf_counter()
+    clients, errors = Client.validate_many(rows)
+    batch = time.perf_counter() - start
+
+    print(f"   по одному:  {single * 1e3:8.1f} мс")
+    print(f"   пакетом:    {batch * 1e3:8.1f} мс")
+
+
+def bench_trusted_load(n=100000):
+    print("Загрузка JSON с валидацией и по контрольной сумме (trusted_load)")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "clients.json")
+        write_json_file(filename, n)
+        Client_rep_json(filename)._write_all_to_file()
+        for trusted in (False, True):
+            start = time.perf_counter()
+            Client_rep_json(filename, trusted_load=trusted)
+            elapsed = time.perf_counter() - start
+            mode = "без проверки" if trusted else "с проверкой"
+            print(f"   N={n:>8} {mode:>13}: {elapsed * 1e3:8.1f} мс")
+
+
+def bench_sort(n=100000, calls=20):
+    print("sort_by_field: первый вызов строит индекс, повторные читают его")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "clients.json")
+        write_json_file(filename, n)
+        repo = Client_rep_json(filename)
+
+        start = time.perf_counter()
+        repo.sort_by_field("last_name")
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(calls):
+            repo.sort_by_field("last_name", reverse=bool(i % 2))
+        repeated = (time.perf_counter() - start) / calls
+
+        data = make_client_data(n + 1)
+        del data["client_id"]
+        start = time.perf_counter()
+        repo.add_client(data)
+        add = time.perf_counter() - start
+
+        print(f"   N={n}: первый {first * 1e3:.1f} мс, повторный {repeated * 1e3:.1f} мс, "
+              f"add_client с индексом {add * 1e3:.1f} мс")
+
+
+def bench_sorted_page(n=100000, size=20, pages=(1, 10, 100)):
+    print("get_sorted_page: первый вызов строит индекс, дальше страницы - срезы индекса")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "clients.json")
+        write_json_file(filename, n)
+        repo = Client_rep_json(filename)
+
+        start = time.perf_counter()
+        repo.get_sorted_page("phone", 1, size)
+        build = time.perf_counter() - start
+        print(f"   первая страница с построением индекса: {build * 1e3:8.2f} мс")
+
+        for page in pages:
+            start = time.perf_counter()
+            repo.get_sorted_page("phone", page, size)
+            sliced = time.perf_counter() - start
+            print(f"   N={n} страница {page:>4}, индекс: {sliced * 1e3:8.2f} мс")
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE client (
+    client_id INTEGER PRIMARY KEY,
+    last_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    otch TEXT,
+    address TEXT NOT NULL,
+    phone TEXT NOT NULL UNIQUE,
+    email TEXT UNIQUE,
+    driver_license TEXT NOT NULL UNIQUE
+)
+"""
+
+
+def make_sqlite_db(n: int):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(SQLITE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO client VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (tuple(make_client_data(i)[f] for f in Client.FIELDS) for i in range(1, n + 1))
+    )
+    conn.commit()
+    return conn
+
+
+def bench_keyset(n=500000, size=20, pages=(1, 100, 1000, 10000, 24000), repeat=20):
+    # SQLite-заглушка: те же запросы, что в ClientRepDB.get_k_n_short_list и get_page_after.
+    # Планировщик SQLite ищет по индексу только по первому столбцу сравнения кортежей,
+    # поэтому поле взято с уникальными значениями; PostgreSQL использует кортеж целиком.
+    print("Пагинация в SQL: LIMIT/OFFSET против курсора (SQLite)")
+    conn = make_sqlite_db(n)
+    conn.execute("CREATE INDEX client_phone_seek_idx ON client (phone, client_id)")
+    for field in ("client_id", "phone"):
+        for page in pages:
+            offset = (page - 1) * size
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(
+                    "SELECT client_id, last_name, first_name, otch, phone, email FROM client "
+                    f"ORDER BY {field}, client_id LIMIT ? OFFSET ?", (size, offset)
+                ).fetchall()
+            by_offset = (time.perf_counter() - start) / repeat
+
+            after = (0, 0)
+            if offset:
+                after = conn.execute(
+                    f"SELECT {field}, client_id FROM client ORDER BY {field}, client_id LIMIT 1 OFFSET ?", (offset - 1,)
+                ).fetchone()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(
+                    "SELECT client_id, last_name, first_name, otch, phone, email FROM client "
+                    f"WHERE ({field}, client_id) > (?, ?) ORDER BY {field}, client_id LIMIT ?", (*after, size)
+                ).fetchall()
+            by_cursor = (time.perf_counter() - start) / repeat
+
+            print(f"   {field:>9} страница {page:>6}: OFFSET {by_offset * 1e3:8.3f} мс, курсор {by_cursor * 1e3:8.3f} мс")
+    conn.close()
+
+
+def bench_db_pool(pool_sizes=(1, 2, 4, 8, 16), threads=16, ops=4000):
+    # нужна локальная PostgreSQL с таблицей client (параметры по умолчанию ClientRepDB)
+    from client_rep_db import ClientRepDB
+
+    print(f"ClientRepDB: пропускная способность get_by_id, {threads} потоков")
+    for size in pool_sizes:
+        repo = ClientRepDB(min_connections=1, max_connections=size)
+        max_id = repo.get_max_client_id() or 1
+        ids = [random.randint(1, max_id) for _ in range(ops)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(repo.get_by_id, ids))
+        elapsed = time.perf_counter() - start
+        repo.close()
+
+        print(f"   пул {size:>3}: {ops / elapsed:10.0f} операций/с")
+
+
+def bench_db_bulk(n=5000, batch_size=1000):
+    # нужна локальная PostgreSQL с таблицей client; вставленные строки удаляются
+    from client_rep_db import ClientRepDB
+
+    print(f"ClientRepDB: вставка {n} клиентов по одному и пакетами")
+    repo = ClientRepDB()
+    base = (repo.get_max_client_id() or 0) + 1_000_000
+    records = []
+    for i in range(base, base + 2 * n):
+        data = make_client_data(i)
+        del data["client_id"]
+        records.append(data)
+
+    start = time.perf_counter()
+    added = [repo.add_client(data) for data in records[:n]]
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk_ids, rejected = repo.add_clients_bulk(records[n:], batch_size=batch_size)
+    bulk = time.perf_counter() - start
+
+    single_ids = [client.client_id for client in added if client]
+    for client_id in single_ids + bulk_ids:
+        repo.delete_by_id(client_id)
+    repo.close()
+
+    print(f"   по одному: {n / single:10.0f} строк/с")
+    print(f"   пакетами:  {n / bulk:10.0f} строк/с (отклонено {len(rejected)})")
+
+
+def bench_db_read(lookups=2000):
+    # нужна локальная PostgreSQL с заполненной таблицей client
+    from client_rep_db import ClientRepDB
+
+    print("ClientRepDB: полная выборка против курсора на сервере, обычный и подготовленный запрос")
+    repo = ClientRepDB()
+    readers = [
+        ("fetchall", lambda: repo.execute_query(repo.SELECT_CLIENT, fetch=True)),
+        ("курсор", lambda: sum(1 for _ in repo.iter_clients())),
+    ]
+    peaks = []
+    for name, read in readers:
+        tracemalloc.start()
+        read()
+        peaks.append((name, tracemalloc.get_traced_memory()[1]))
+        tracemalloc.stop()
+
+    max_id = repo.get_max_client_id() or 1
+    ids = [random.randint(1, max_id) for _ in range(lookups)]
+    plain_query = repo.SELECT_CLIENT + " WHERE client_id = %s"
+    start = time.perf_counter()
+    for client_id in ids:
+        repo.execute_query(plain_query, (client_id,), fetch=True)
+    plain = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for client_id in ids:
+        repo.execute_prepared("client_get_by_id", (client_id,), fetch=True)
+    prepared = time.perf_counter() - start
+    repo.close()
+
+    for name, peak in peaks:
+        print(f"   {name:>8}: пик {peak / 2 ** 20:7.1f} МБ")
+    print(f"   get_by_id обычный:        {plain / lookups * 1e6:8.1f} мкс")
+    print(f"   get_by_id подготовленный: {prepared / lookups * 1e6:8.1f} мкс")
+
+
+def bench_db_cache(lookups=5000, hot=100):
+    # нужна локальная PostgreSQL с заполненной таблицей client
+    from client_rep_db import ClientRepDB
+
+    print(f"ClientRepDB: get_by_id по {hot} горячим клиентам без кэша и с кэшем")
+    for cache_size in (0, 1024):
+        repo = ClientRepDB(cache_size=cache_size)
+        max_id = repo.get_max_client_id() or 1
+        ids = [random.randint(1, min(hot, max_id)) for _ in range(lookups)]
+
+        start = time.perf_counter()
+        for client_id in ids:
+            repo.get_by_id(client_id)
+        elapsed = time.perf_counter() - start
+        stats = repo.cache_stats()["clients"]
+        repo.close()
+
+        print(f"   кэш {cache_size:>5}: {elapsed / lookups * 1e6:8.1f} мкс на поиск, "
+              f"попаданий {stats['hit_rate']:.0%}")
+
+
+def bench_formats(sizes=(1000, 10000)):
+    import yaml
+    from inheritance import ClientRepBinary, ClientRepJSON, ClientRepYAML
+
+    class PurePythonYAML(ClientRepYAML):
+        loader = yaml.SafeLoader
+        dumper = yaml.SafeDumper
+
+    formats = [
+        ("JSON", ClientRepJSON, "json"),
+        ("YAML (C)", ClientRepYAML, "yaml"),
+        ("YAML", PurePythonYAML, "yaml"),
+        ("двоичный", ClientRepBinary, "bin"),
+    ]
+    print("Форматы хранения: загрузка, сохранение и размер файла")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            clients = [Client(**make_client_data(i)) for i in range(1, n + 1)]
+            for name, repo_class, ext in formats:
+                filename = os.path.join(tmp, f"clients_{n}_{repo_class.__name__}.{ext}")
+                repo = repo_class(filename)
+                repo.clients = clients
+                start = time.perf_counter()
+                repo._write_all_to_file()
+                save = time.perf_counter() - start
+
+                start = time.perf_counter()
+                repo_class(filename)
+                load = time.perf_counter() - start
+
+                size = os.path.getsize(filename)
+                print(f"   N={n:>7} {name:>9}: загрузка {load * 1e3:9.1f} мс, "
+                      f"сохранение {save * 1e3:9.1f} мс, {size / 2 ** 20:7.2f} МБ")
+
+
+def bench_backends(n=10000, lookups=10000, size=20, writes=100):
+    from client_rep_yaml import ClientRepYAML
+    from inheritance import ClientRepBinary
+
+    # одни и те же операции общего хранилища поверх каждого формата
+    backends = [
+        ("JSON", Client_rep_json, "json", {}),
+        ("JSON lazy", Client_rep_json, "json", {"lazy": True}),
+        ("YAML", ClientRepYAML, "yaml", {}),
+        ("двоичный", ClientRepBinary, "bin", {}),
+    ]
+    print(f"Общее хранилище поверх форматов, N={n}")
+    with tempfile.TemporaryDirectory() as tmp:
+        clients = [Client(**make_client_data(i)) for i in range(1, n + 1)]
+        ids = [random.randint(1, n) for _ in range(lookups)]
+        for name, repo_class, ext, kwargs in backends:
+            filename = os.path.join(tmp, f"clients_{ext}.{ext}")
+            if not os.path.exists(filename):
+                repo = repo_class(filename)
+                repo.clients = clients
+                repo._write_all_to_file()
+
+            timings = {}
+            start = time.perf_counter()
+            repo = repo_class(filename, durability="none", **kwargs)
+            timings["загрузка"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for client_id in ids:
+                repo.get_by_id(client_id)
+            timings["get_by_id"] = (time.perf_counter() - start) / lookups
+
+            start = time.perf_counter()
+            repo.get_sorted_page("last_name", 10, size)
+            repo.get_sorted_page("last_name", 11, size)
+            timings["страница"] = time.perf_counter() - start
+
+            records = []
+            for i in range(writes):
+                data = make_client_data(n + i + 1)
+                del data["client_id"]
+                records.append(data)
+            start = time.perf_counter()
+            added = repo.add_clients(records)
+            repo.delete_by_ids(c.client_id for c in added)
+            repo.close()
+            timings["пакет"] = time.perf_counter() - start
+
+            print(f"   {name:>9}: загрузка {timings['загрузка'] * 1e3:8.1f} мс, "
+                  f"get_by_id {timings['get_by_id'] * 1e6:6.2f} мкс, "
+                  f"2 страницы {timings['страница'] * 1e3:7.1f} мс, "
+                  f"{writes} добавлений и удалений пакетом {timings['пакет'] * 1e3:8.1f} мс")
+
+
+def bench_logging(n=10000, lookups=20000, pages=200, sorts=5):
+    import logging
+    from logs import enable_console_logging, logger
+
+    print("Журналирование операций: выключено, INFO и DEBUG с выводом в /dev/null")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "clients.json")
+        write_json_file(filename, n)
+        repo = Client_rep_json(filename)
+        repo.sort_by_field("last_name")
+        ids = [random.randint(1, n) for _ in range(lookups)]
+
+        for name, level in (("выключено", None), ("INFO", logging.INFO), ("DEBUG", logging.DEBUG)):
+            with open(os.devnull, "w") as devnull:
+                handler = enable_console_logging(level, devnull) if level is not None else None
+                try:
+                    start = time.perf_counter()
+                    for client_id in ids:
+                        repo.get_by_id(client_id)
+                    by_id = (time.perf_counter() - start) / lookups
+
+                    start = time.perf_counter()
+                    for page in range(1, pages + 1):
+                        repo.get_sorted_page("last_name", page, 20)
+                    page_time = (time.perf_counter() - start) / pages
+
+                    start = time.perf_counter()
+                    for _ in range(sorts):
+                        repo.sort_by_field("last_name")
+                    sort_time = (time.perf_counter() - start) / sorts
+                finally:
+                    if handler is not None:
+                        logger.removeHandler(handler)
+                        logger.setLevel(logging.NOTSET)
+
+            print(f"   {name:>9}: get_by_id {by_id * 1e6:7.2f} мкс, страница {page_time * 1e3:6.3f} мс, "
+                  f"sort_by_field {sort_time * 1e3:8.1f} мс")
+
+
+def bench_metrics(n=10000, lookups=20000, pages=200):
+    from metrics import Metrics
+
+    print("Метрики операций: затраты на замер и перцентили задержек")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "clients.json")
+        write_json_file(filename, n)
+        repo = Client_rep_json(filename)
+        repo.sort_by_field("last_name")
+        ids = [random.randint(1, n) for _ in range(lookups)]
+
+        for name, enabled in (("выключены", False), ("включены", True)):
+            repo.metrics = Metrics(enabled=enabled)
+            start = time.perf_counter()
+            for client_id in ids:
+                repo.get_by_id(client_id)
+            by_id = (time.perf_counter() - start) / lookups
+            start = time.perf_counter()
+            for page in range(1, pages + 1):
+                repo.get_sorted_page("last_name", page, 20)
+            page_time = (time.perf_counter() - start) / pages
+            print(f"   {name:>9}: get_by_id {by_id * 1e6:6.2f} мкс, страница {page_time * 1e3:6.3f} мс")
+
+        for operation, stats in repo.metrics.snapshot()["operations"].items():
+            print(f"   {operation}: {stats['count']} вызовов, p50 {stats['p50_ms'] * 1e3:7.2f} мкс, "
+                  f"p95 {stats['p95_ms'] * 1e3:7.2f} мкс, p99 {stats['p99_ms'] * 1e3:7.2f} мкс")
+
+
+def bench_mmap(sizes=(10000, 100000), lookups=10000):
+    from client_rep_mmap import ClientRepMMap
+    from inheritance import ClientRepBinary
+
+    print("Отображаемый в память файл против двоичного снимка: открытие, get_by_id, страница")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            clients = [Client(**make_client_data(i)) for i in range(1, n + 1)]
+            stores = [
+                ("двоичный", ClientRepBinary, os.path.join(tmp, f"clients_{n}.bin")),
+                ("mmap", ClientRepMMap, os.path.join(tmp, f"clients_{n}.mmap")),
+            ]
+            binary = ClientRepBinary(stores[0][2])
+            binary.clients = clients
+            binary._write_all_to_file()
+            mapped = ClientRepMMap(stores[1][2], initial_capacity=n, sync=False)
+            for c in clients:
+                mapped._write_client(c)
+            mapped.last_id = mapped.count = n
+            mapped._write_header()
+            mapped.close()
+
+            ids = [random.randint(1, n) for _ in range(lookups)]
+            for name, repo_class, filename in stores:
+                gc.collect()
+                start = time.perf_counter()
+                repo = repo_class(filename)
+                opened = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for client_id in ids:
+                    repo.get_by_id(client_id)
+                lookup = (time.perf_counter() - start) / lookups
+
+                start = time.perf_counter()
+                repo.get_k_n_short_list(n // 20, 20)
+                page = time.perf_counter() - start
+                if hasattr(repo, "close"):
+                    repo.close()
+                del repo
+
+                print(f"   N={n:>7} {name:>9}: открытие {opened * 1e3:8.2f} мс, "
+                      f"get_by_id {lookup * 1e6:6.2f} мкс, страница {page * 1e3:6.3f} мс")
+
+
+def bench_durability(n=5000, writes=100, commit_delay=0.02):
+    print("Атомарная запись JSON: уровни надёжности и групповая фиксация")
+    with tempfile.TemporaryDirectory() as tmp:
+        for durability in ("none", "file", "dir"):
+            for delay in (0.0, commit_delay):
+                filename = os.path.join(tmp, f"clients_{durability}_{delay}.json")
+                write_json_file(filename, n)
+                repo = Client_rep_json(filename, durability=durability, commit_delay=delay)
+
+                start = time.perf_counter()
+                for i in range(writes):
+                    data = make_client_data(n + i + 1)
+                    del data["client_id"]
+                    repo.add_client(data)
+                repo.close()
+                elapsed = time.perf_counter() - start
+
+                mode = f"группа {delay * 1e3:.0f} мс" if delay else "каждая"
+                print(f"   {durability:>4} {mode:>13}: {writes / elapsed:9.1f} изменений/с, "
+                      f"записей файла {repo._writer.writes}")
+
+
+def bench_batch(n=5000, writes=200):
+    print("Пакетная запись: add_client по одному и add_clients одним пакетом")
+    with tempfile.TemporaryDirectory() as tmp:
+        for journal in (False, True):
+            for mode in ("по одному", "пакет"):
+                filename = os.path.join(tmp, f"clients_{journal}_{mode}.json")
+                write_json_file(filename, n)
+                repo = Client_rep_json(filename, journal=journal, compact_every=writes * 2, durability="none")
+                records = []
+                for i in range(writes):
+                    data = make_client_data(n + i + 1)
+                    del data["client_id"]
+                    records.append(data)
+
+                start = time.perf_counter()
+                if mode == "пакет":
+                    repo.add_clients(records)
+                else:
+                    for data in records:
+                        repo.add_client(data)
+                repo.close()
+                elapsed = time.perf_counter() - start
+
+                storage = "журнал" if journal else "снимок"
+                print(f"   {storage:>6} {mode:>9}: {elapsed * 1e3:9.1f} мс, записей файла {repo._writer.writes}")
+
+
+def bench_async(n=20000, writes=20, readers=50):
+    from async_repository import AsyncClientRepFile
+
+    print("asyncio: задержка цикла событий при записи в JSON, вызов в цикле и в потоке")
+
+    async def heartbeat(stop, lags, interval=0.001):
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lags.append(loop.time() - start - interval)
+
+    async def run(repo, offload):
+        stop = asyncio.Event()
+        lags = []
+        ticker = asyncio.create_task(heartbeat(stop, lags))
+        await asyncio.sleep(0.01)
+
+        async def writer():
+            for i in range(writes):
+                data = make_client_data(n + i + 1)
+                del data["client_id"]
+                if offload:
+                    await repo.add_client(data)
+                else:
+                    repo.add_client(data)
+                    await asyncio.sleep(0)
+
+        async def reader():
+            for i in range(writes):
+                client_id = random.randint(1, n)
+                if offload:
+                    await repo.get_by_id(client_id)
+                else:
+                    repo.get_by_id(client_id)
+                    await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await ticker
+        return elapsed, max(lags)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for offload in (False, True):
+            filename = os.path.join(tmp, f"clients_{offload}.json")
+            write_json_file(filename, n)
+            repo = Client_rep_json(filename)
+            if offload:
+                repo = AsyncClientRepFile(repo)
+            elapsed, lag = asyncio.run(run(repo, offload))
+            if offload:
+                asyncio.run(repo.close())
+            mode = "в потоке" if offload else "в цикле"
+            print(f"   N={n} {mode:>9}: {elapsed * 1e3:8.1f} мс всего, "
+                  f"максимальная задержка цикла {lag * 1e3:7.1f} мс")
+
+
+BENCHMARKS = {
+    "get_by_id": bench_get_by_id,
+    "journal": bench_journal,
+    "lazy_load": bench_lazy_load,
+    "client_memory": bench_client_memory,
+    "validation": bench_validation,
+    "trusted_load": bench_trusted_load,
+    "sort": bench_sort,
+    "sorted_page": bench_sorted_page,
+    "keyset": bench_keyset,
+    "db_pool": bench_db_pool,
+    "db_bulk": bench_db_bulk,
+    "db_read": bench_db_read,
+    "db_cache": bench_db_cache,
+    "formats": bench_formats,
+    "backends": bench_backends,
+    "logging": bench_logging,
+    "metrics": bench_metrics,
+    "mmap": bench_mmap,
+    "durability": bench_durability,
+    "batch": bench_batch,
+    "async": bench_async,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
@@ -0,0 +1,310 @@
+import argparse
+import datetime
+import gc
+import importlib
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generator import LAST_NAMES, generate_client_data, generate_clients, new_client_records
+from benchmarks.micro import SQLITE_SCHEMA
+from client import Client, ClientShort
+
+
+OPERATIONS = ("load", "save", "get_by_id", "page", "sorted_page", "sort", "search", "add", "replace", "delete", "count")
+
+
+class SQLiteClientRepo:
+    # те же запросы, что выполняет ClientRepDB, но на SQLite: для сравнения без сервера PostgreSQL
+    def __init__(self, filename: str):
+        self.conn = sqlite3.connect(filename)
+
+    def create(self, n: int, seed=0):
+        self.conn.execute(SQLITE_SCHEMA)
+        self.conn.executemany(
+            "INSERT INTO client VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (tuple(data[f] for f in Client.FIELDS) for data in generate_client_data(n, seed=seed))
+        )
+        self.conn.commit()
+
+    def _read_all_from_file(self):
+        rows = self.conn.execute(
+            "SELECT client_id, last_name, first_name, otch, address, phone, email, driver_license FROM client"
+        ).fetchall()
+        clients, errors = Client.validate_many(dict(zip(Client.FIELDS, row)) for row in rows)
+        return clients
+
+    @staticmethod
+    def _short_from_row(row):
+        return ClientShort(row[0], row[1], row[2], row[3], row[5] if row[5] else row[4])
+
+    def get_by_id(self, client_id: int):
+        row = self.conn.execute(
+            "SELECT client_id, last_name, first_name, otch, address, phone, email, driver_license "
+            "FROM client WHERE client_id = ?", (client_id,)
+        ).fetchone()
+        return Client(**dict(zip(Client.FIELDS, row))) if row else None
+
+    def get_k_n_short_list(self, n: int, k: int):
+        rows = self.conn.execute(
+            "SELECT client_id, last_name, first_name, otch, phone, email FROM client "
+            "ORDER BY client_id LIMIT ? OFFSET ?", (k, (n - 1) * k)
+        ).fetchall()
+        return [self._short_from_row(row) for row in rows]
+
+    def get_sorted_page(self, field="last_name", page=1, size=10, reverse=False):
+        direction = "DESC" if reverse else "ASC"
+        rows = self.conn.execute(
+            "SELECT client_id, last_name, first_name, otch, phone, email FROM client "
+            f"ORDER BY {field} {direction}, client_id {direction} LIMIT ? OFFSET ?", (size, (page - 1) * size)
+        ).fetchall()
+        return [self._short_from_row(row) for row in rows]
+
+    def sort_by_field(self, field="last_name", reverse=False):
+        direction = "DESC" if reverse else "ASC"
+        rows = self.conn.execute(
+            "SELECT client_id, last_name, first_name, otch, address, phone, email, driver_license FROM client "
+            f"ORDER BY {field} {direction}, client_id {direction}"
+        ).fetchall()
+        return [Client(**dict(zip(Client.FIELDS, row))) for row in rows]
+
+    def add_client(self, client_data: dict):
+        new_id = self.conn.execute("SELECT COALESCE(MAX(client_id), 0) + 1 FROM client").fetchone()[0]
+        client = Client(client_id=new_id, **client_data)
+        with self.conn:
+            self.conn.execute("INSERT INTO client VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              tuple(getattr(client, f) for f in Client.FIELDS))
+        return client
+
+    def replace_by_id(self, client_id: int, new_data: dict):
+        client = Client(client_id=client_id, **new_data)
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE client SET last_name = ?, first_name = ?, otch = ?, address = ?, phone = ?, email = ?, "
+                "driver_license = ? WHERE client_id = ?",
+                tuple(getattr(client, f) for f in Client.FIELDS[1:]) + (client_id,)
+            )
+        return cursor.rowcount > 0
+
+    def delete_by_id(self, client_id: int):
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM client WHERE client_id = ?", (client_id,))
+        return cursor.rowcount > 0
+
+    def get_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM client").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+FILE_BACKENDS = {
+    "json": ("client_rep_json", "Client_rep_json", "json", {}),
+    "json_lazy": ("client_rep_json", "Client_rep_json", "json", {"lazy": True}),
+    "yaml": ("client_rep_yaml", "ClientRepYAML", "yaml", {}),
+    "inheritance_json": ("inheritance", "ClientRepJSON", "json", {}),
+    "inheritance_yaml": ("inheritance", "ClientRepYAML", "yaml", {}),
+    "inheritance_binary": ("inheritance", "ClientRepBinary", "bin", {}),
+}
+
+
+def _file_backend(name, tmp, n, seed):
+    module, class_name, ext, kwargs = FILE_BACKENDS[name]
+    repo_class = getattr(importlib.import_module(module), class_name)
+    filename = os.path.join(tmp, f"clients_{n}.{ext}")
+    # файл пишет обычный экземпляр: ленивый хранит клиентов в LazyClientList, а не в списке
+    repo = repo_class(filename, durability="none")
+    repo.clients = generate_clients(n, seed=seed)
+    repo._write_all_to_file()
+    return lambda: repo_class(filename, durability="none", **kwargs), range(1, n + 1), None
+
+
+def _mmap_backend(name, tmp, n, seed):
+    from client_rep_mmap import ClientRepMMap
+
+    filename = os.path.join(tmp, f"clients_{n}.mmap")
+    repo = ClientRepMMap(filename, initial_capacity=n, sync=False)
+    for client in generate_clients(n, seed=seed):
+        repo._write_client(client)
+    repo.count = repo.last_id = n
+    repo._write_header()
+    repo.close()
+    return lambda: ClientRepMMap(filename, sync=False), range(1, n + 1), None
+
+
+def _sqlite_backend(name, tmp, n, seed):
+    filename = os.path.join(tmp, f"clients_{n}.sqlite")
+    SQLiteClientRepo(filename).create(n, seed)
+    return lambda: SQLiteClientRepo(filename), range(1, n + 1), None
+
+
+def _postgres_backend(name, tmp, n, seed):
+    # нужна локальная PostgreSQL с таблицей client (параметры по умолчанию ClientRepDB);
+    # клиенты добавляются с номерами за пределами существующих и удаляются после прогона
+    from client_rep_db import ClientRepDB
+
+    repo = ClientRepDB()
+    start = (repo.get_max_client_id() or 0) + 1_000_000
+    inserted, rejected = repo.add_clients_bulk(new_client_records(n, start, seed))
+    if rejected:
+        repo.execute_query("DELETE FROM client WHERE client_id = ANY(%s)", (inserted,))
+        repo.close()
+        raise RuntimeError(f"База отклонила {len(rejected)} сгенерированных клиентов")
+
+    def cleanup():
+        repo.execute_query("DELETE FROM client WHERE client_id = ANY(%s)", (inserted,))
+        repo.close()
+
+    return lambda: repo, inserted, cleanup
+
+
+BACKENDS = dict.fromkeys(FILE_BACKENDS, _file_backend)
+BACKENDS.update({
+    "mmap": _mmap_backend,
+    "sqlite": _sqlite_backend,
+    "postgres": _postgres_backend,
+})
+DEFAULT_BACKENDS = ["json", "yaml", "inheritance_binary", "mmap", "sqlite"]
+
+
+def _measure(results, backend, n, operation, calls, func):
+    gc.collect()
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    total = time.perf_counter() - start
+    results.append({
+        "backend": backend,
+        "n": n,
+        "operation": operation,
+        "calls": calls,
+        "total_s": total,
+        "mean_us": total / calls * 1e6,
+        "ops_per_s": calls / total if total else None
+    })
+
+
+def run_backend(name, n, seed=0, lookups=1000, pages=50, sorts=3, writes=20):
+    results = []
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        opener, ids, cleanup = BACKENDS[name](name, tmp, n, seed)
+        repos = []
+        try:
+            _measure(results, name, n, "load", 1, lambda i: repos.append(opener()))
+            repo = repos[-1]
+            if hasattr(repo, "_writer"):
+                _measure(results, name, n, "save", 1, lambda i: repo._write_all_to_file())
+
+            lookup_ids = [rng.choice(ids) for _ in range(lookups)]
+            _measure(results, name, n, "get_by_id", lookups, lambda i: repo.get_by_id(lookup_ids[i]))
+
+            last_page = max(n // 20, 1)
+            page_numbers = [rng.randint(1, last_page) for _ in range(pages)]
+            _measure(results, name, n, "page", pages, lambda i: repo.get_k_n_short_list(page_numbers[i], 20))
+            _measure(results, name, n, "sorted_page", pages,
+                     lambda i: repo.get_sorted_page("last_name", page_numbers[i], 20))
+            _measure(results, name, n, "sort", sorts, lambda i: repo.sort_by_field("first_name", reverse=bool(i % 2)))
+            if hasattr(repo, "search"):
+                prefixes = [rng.choice(LAST_NAMES)[rng.random() < 0.5][:4] for _ in range(lookups)]
+                _measure(results, name, n, "search", lookups, lambda i: repo.search(prefixes[i]))
+
+            start = max(ids) + 1_000_000
+            records = new_client_records(writes, start, seed)
+            updates = new_client_records(writes, start + writes, seed)
+            added = []
+            _measure(results, name, n, "add", writes, lambda i: added.append(repo.add_client(dict(records[i]))))
+            _measure(results, name, n, "replace", writes,
+                     lambda i: repo.replace_by_id(added[i].client_id, dict(updates[i])))
+            _measure(results, name, n, "delete", writes, lambda i: repo.delete_by_id(added[i].client_id))
+            _measure(results, name, n, "count", lookups, lambda i: repo.get_count())
+        finally:
+            if cleanup is not None:
+                cleanup()
+            else:
+                for repo in repos:
+                    close = getattr(repo, "close", None)
+                    if close is not None:
+                        close()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(sizes=(1000, 10000), backends=None, seed=0, **kwargs):
+    results = []
+    for n in sizes:
+        for name in backends or DEFAULT_BACKENDS:
+            print(f"{name}, N={n}", file=sys.stderr)
+            results.extend(run_backend(name, n, seed, **kwargs))
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed
+        },
+        "results": results
+    }
+
+
+def compare(report, baseline, threshold=0.2):
+    # регрессия: среднее время операции выросло больше чем на threshold относительно базового прогона
+    previous = {(r["backend"], r["n"], r["operation"]): r["mean_us"] for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        before = previous.get((r["backend"], r["n"], r["operation"]))
+        if before and r["mean_us"] > before * (1 + threshold):
+            regressions.append((r["backend"], r["n"], r["operation"], before, r["mean_us"]))
+    return regressions
+
+
+def print_report(report):
+    for r in report["results"]:
+        print(f"   {r['backend']:>18} N={r['n']:>8} {r['operation']:>11}: {r['mean_us']:12.2f} мкс "
+              f"({r['calls']} вызовов)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Набор тестов производительности репозиториев клиентов")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=DEFAULT_BACKENDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--baseline", help="результаты прошлого прогона для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.backends, args.seed, lookups=args.lookups, writes=args.writes)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for backend, n, operation, before, after in regressions:
+            print(f"Регрессия {backend} N={n} {operation}: {before:.2f} -> {after:.2f} мкс")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,20 @@
 import re
 
+PHONE_RE = re.compile(r"^\+7\d{10}$")
+EMAIL_RE = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+
+ID_ERROR = "client_id должен быть положительным целым числом"
+NAME_ERROR = "{} должно содержать только буквы и не быть пустым"
+ADDRESS_ERROR = "Адрес не может быть пустым"
+PHONE_ERROR = "Телефон должен быть в формате +7XXXXXXXXXX"
+EMAIL_ERROR = "Некорректный email"
+LICENSE_ERROR = "Номер водительского удостоверения должен содержать 10 цифр"
+RECORD_ERROR = "Запись клиента должна быть объектом с полями клиента"
+
+
 class ClientShort:
+    __slots__ = ("_client_id", "_last_name", "_first_name", "_otch", "_contact")
+
     def __init__(self, client_id: int, last_name: str, first_name: str, otch: str = None, contact: str = None):
         self._client_id = self._validate_id(client_id)
         self._last_name = self._validate_name(last_name, "Фамилия")
@@ -31,14 +45,14 @@ class ClientShort:
     @staticmethod
     def _validate_id(value):
         if not isinstance(value, int) or value <= 0:
-            raise ValueError("client_id должен быть положительным целым числом")
+            raise ValueError(ID_ERROR)
         return value
 
     @staticmethod
     def _validate_name(value, field_name):
         value = str(value).strip()
         if not value or not value.replace(" ", "").isalpha():
-            raise ValueError(f"{field_name} должно содержать только буквы и не быть пустым")
+            raise ValueError(NAME_ERROR.format(field_name))
         return value.title()
 
     def fio_full(self):
@@ -65,45 +79,131 @@ class ClientShort:
 
 
 class Client(ClientShort):
+    __slots__ = ("address", "phone", "email", "driver_license")
+
     FIELDS = ["client_id", "last_name", "first_name", "otch", "address", "phone", "email", "driver_license"]
 
     def __init__(self, client_id, last_name, first_name, address, phone, driver_license, otch=None, email=None):
-        contact = email if email else phone
-        super().__init__(client_id, last_name, first_name, otch, contact)
-        
+        super().__init__(client_id, last_name, first_name, otch)
+
         self.address = self._validate_address(address)
         self.phone = self._validate_phone(phone)
         self.email = self._validate_email(email) if email else None
         self.driver_license = self._validate_license(driver_license)
 
+    @property
+    def contact(self):
+        return self.email if self.email else self.phone
+
     @staticmethod
     def _validate_address(value):
         value = str(value).strip()
         if not value:
-            raise ValueError("Адрес не может быть пустым")
+            raise ValueError(ADDRESS_ERROR)
         return value
 
     @staticmethod
     def _validate_phone(value):
         value = str(value)
-        if not re.match(r"^\+7\d{10}$", value):
-            raise ValueError("Телефон должен быть в формате +7XXXXXXXXXX")
+        if not PHONE_RE.match(value):
+            raise ValueError(PHONE_ERROR)
         return value
 
     @staticmethod
     def _validate_email(value):
         value = str(value)
-        if not re.match(r"^[\w\.-]+@[\w\.-]+\.\w+$", value):
-            raise ValueError("Некорректный email")
+        if not EMAIL_RE.match(value):
+            raise ValueError(EMAIL_ERROR)
         return value
 
     @staticmethod
     def _validate_license(value):
         value = str(value)
         if len(value) != 10 or not value.isdigit():
-            raise ValueError("Номер водительского удостоверения должен содержать 10 цифр")
+            raise ValueError(LICENSE_ERROR)
         return value
 
+    @classmethod
+    def from_trusted_row(cls, row):
+        if isinstance(row, dict):
+            row = tuple(map(row.get, cls.FIELDS))
+        client_id, last_name, first_name, otch, address, phone, email, driver_license = row
+        client = cls.__new__(cls)
+        client._client_id = client_id
+        client._last_name = last_name
+        client._first_name = first_name
+        client._otch = otch
+        client.address = address
+        client.phone = phone
+        client.email = email
+        client.driver_license = driver_license
+        return client
+
+    @classmethod
+    def validate_rows(cls, records):
+        # проверка без создания объектов: корректные записи возвращаются кортежами в порядке FIELDS
+        rows = []
+        errors = []
+        phone_match = PHONE_RE.match
+        email_match = EMAIL_RE.match
+
+        for i, item in enumerate(records):
+            if not isinstance(item, dict):
+                errors.append((i, RECORD_ERROR))
+                continue
+            try:
+                client_id = item["client_id"]
+                last_name = str(item["last_name"]).strip()
+                first_name = str(item["first_name"]).strip()
+                address = str(item["address"]).strip()
+                phone = str(item["phone"])
+                driver_license = str(item["driver_license"])
+            except KeyError as e:
+                errors.append((i, f"Отсутствует обязательное поле: {e}"))
+                continue
+            otch = item.get("otch")
+            email = item.get("email")
+
+            if type(client_id) is not int or client_id <= 0:
+                errors.append((i, ID_ERROR))
+            elif not last_name.replace(" ", "").isalpha():
+                errors.append((i, NAME_ERROR.format("Фамилия")))
+            elif not first_name.replace(" ", "").isalpha():
+                errors.append((i, NAME_ERROR.format("Имя")))
+            elif otch and not str(otch).strip().replace(" ", "").isalpha():
+                errors.append((i, NAME_ERROR.format("Отчество")))
+            elif not address:
+                errors.append((i, ADDRESS_ERROR))
+            elif not phone_match(phone):
+                errors.append((i, PHONE_ERROR))
+            elif email and not email_match(str(email)):
+                errors.append((i, EMAIL_ERROR))
+            elif len(driver_license) != 10 or not driver_license.isdigit():
+                errors.append((i, LICENSE_ERROR))
+            else:
+                rows.append((client_id, last_name.title(), first_name.title(),
+                             str(otch).strip().title() if otch else None, address, phone,
+                             str(email) if email else None, driver_license))
+        return rows, errors
+
+    @classmethod
+    def validate_many(cls, records):
+        rows, errors = cls.validate_rows(records)
+        new = cls.__new__
+        clients = []
+        for client_id, last_name, first_name, otch, address, phone, email, driver_license in rows:
+            client = new(cls)
+            client._client_id = client_id
+            client._last_name = last_name
+            client._first_name = first_name
+            client._otch = otch
+            client.address = address
+            client.phone = phone
+            client.email = email
+            client.driver_license = driver_license
+            clients.append(client)
+        return clients, errors
+
     def full_repr(self):
         return ", ".join(f"{key}='{getattr(self, key)}'" for key in self.FIELDS if getattr(self, key) is not None)
 
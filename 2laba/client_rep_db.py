@@ -1,75 +1,271 @@
+import base64
+import json
+import logging
 import psycopg2
+import psycopg2.errors
+import psycopg2.pool
+from psycopg2.extras import execute_values
 import re
+import threading
+import time
+from contextlib import contextmanager
+from cache import LRUCache
 from client import Client, ClientShort
+from indexes import SEARCH_FIELDS, UNIQUE_FIELDS, check_sort_field
+from logs import get_logger
+from metrics import registry, timed
+from snapshot_meta import SCHEMA_VERSION
+
+
+class ReusingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    # psycopg2 закрывает возвращённое соединение, если свободных уже minconn, и при параллельной
+    # нагрузке соединения открываются заново вместе со своими подготовленными запросами;
+    # здесь при создании открывается minconn соединений, а свободными остаются до maxconn
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.minconn = maxconn
 
 
 class ClientRepDB:
+    logger = get_logger("db")
+    metrics = registry
+    SCHEMA_MARKER = f"clients schema v{SCHEMA_VERSION}"
+    NULLABLE_FIELDS = ["otch", "email"]
+    ID_SEQUENCE = "client_id_seq"
+    SELECT_CLIENT = "SELECT client_id, last_name, first_name, otch, address, phone, email, driver_license FROM client"
+    PREPARED_STATEMENTS = {
+        "client_get_by_id": ("integer", SELECT_CLIENT + " WHERE client_id = $1"),
+        "client_get_by_phone": ("text", SELECT_CLIENT + " WHERE phone = $1"),
+        "client_get_by_email": ("text", SELECT_CLIENT + " WHERE email = $1"),
+        "client_get_by_driver_license": ("text", SELECT_CLIENT + " WHERE driver_license = $1"),
+        "client_count": (None, "SELECT COUNT(*) FROM client"),
+        "client_delete_by_id": ("integer", "DELETE FROM client WHERE client_id = $1 RETURNING "
+                                           "client_id, last_name, first_name, otch, address, phone, email, driver_license"),
+    }
+
     def __init__(self, host='localhost', user='postgres', password='123',
-                 database='clients_auto', port='5432'):
+                 database='clients_auto', port='5432', trusted_load=False,
+                 min_connections=1, max_connections=10, health_check_interval=30, fetch_batch_size=1000,
+                 cache_size=1024, cache_ttl=60):
         self.host = host 
         self.user = user
         self.password = password
         self.database = database
         self.port = port
-        self.connection = None 
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.health_check_interval = health_check_interval
+        self.fetch_batch_size = fetch_batch_size
+        self.cache = LRUCache(cache_size, cache_ttl)
+        self.count_cache = LRUCache(1 if cache_size > 0 else 0, cache_ttl)
+        self.pool = None
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._pool_lock = threading.Lock()
+        self._last_used = {}
+        self._prepared = {}
+        self._id_sequence_ready = False
+        self.trusted = False
         self.connect()
+        if trusted_load:
+            self.trusted = self.check_schema_marker()
 
     def connect(self):
-        try:
-            self.connection = psycopg2.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                port=self.port,
-            )
-            print(f"Успешное подключение к базе данных '{self.database}'")
-        except psycopg2.Error as e:
-            print(f"Ошибка подключения к базе данных: {e}")
+        with self._pool_lock:
+            if self.pool is not None:
+                return
+            try:
+                self.pool = ReusingConnectionPool(
+                    self.min_connections,
+                    self.max_connections,
+                    host=self.host,
+                    user=self.user,
+                    password=self.password,
+                    database=self.database,
+                    port=self.port,
+                )
+                self.logger.info("Успешное подключение к базе данных '%s' (пул %d-%d соединений)",
+                                 self.database, self.min_connections, self.max_connections)
+            except psycopg2.Error as e:
+                self.logger.error("Ошибка подключения к базе данных: %s", e)
 
-    def execute_query(self, query, params=None, fetch=False):
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            return True
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
-            if fetch:
-                result = cursor.fetchall()
-            else:
-                result = cursor.rowcount
-            self.connection.commit()
-            cursor.close()
-            return result
-        except psycopg2.Error as e:
-            self.connection.rollback()
-            print(f"Ошибка выполнения запроса: {e}")
-            return None
-        except Exception as e:
-            self.connection.rollback()
-            print(f"Общая ошибка: {e}")
-            return None
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
 
+    def _release(self, conn, broken=False):
+        if broken:
+            self._last_used.pop(id(conn), None)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+        self.pool.putconn(conn, close=broken)
+        if conn.closed:
+            # подготовленные запросы живут только в своём соединении
+            self._last_used.pop(id(conn), None)
+            self._prepared.pop(id(conn), None)
+
+    @contextmanager
+    def _connection(self):
+        if self.pool is None:
+            self.connect()
+        if self.pool is None:
+            raise psycopg2.OperationalError("Нет подключения к базе данных")
+
+        with self._slots:
+            conn = self.pool.getconn()
+            if not self._is_healthy(conn):
+                self._release(conn, broken=True)
+                conn = self.pool.getconn()
+            if not conn.autocommit:
+                conn.autocommit = True
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self._release(conn, broken=True)
+                raise
+            except BaseException:
+                self._release(conn)
+                raise
+            else:
+                self._release(conn)
+
+    @contextmanager
+    def _transaction(self, name=None):
+        with self._connection() as conn:
+            conn.autocommit = False
+            try:
+                with conn.cursor(name) as cursor:
+                    yield cursor
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = True
+
+    def _prepare(self, conn, cursor, name):
+        prepared = self._prepared.setdefault(id(conn), set())
+        if name in prepared:
+            return
+        types, statement = self.PREPARED_STATEMENTS[name]
+        signature = f" ({types})" if types else ""
+        cursor.execute(f"PREPARE {name}{signature} AS {statement}")
+        prepared.add(name)
+
+    @timed("execute_query")
+    def execute_query(self, query, params=None, fetch=False, prepare=None, retry=None):
+        # чтение повторяется один раз на новом соединении, запись не повторяется
+        attempts = 2 if (fetch if retry is None else retry) else 1
+        for attempt in range(1, attempts + 1):
+            try:
+                with self._connection() as conn:
+                    with conn.cursor() as cursor:
+                        if prepare:
+                            self._prepare(conn, cursor, prepare)
+                        try:
+                            cursor.execute(query, params or ())
+                        except psycopg2.errors.InvalidSqlStatementName:
+                            # соединение не знает запрос, хотя он отмечен подготовленным: готовим заново
+                            if not prepare:
+                                raise
+                            self._prepared.pop(id(conn), None)
+                            self._prepare(conn, cursor, prepare)
+                            cursor.execute(query, params or ())
+                        if fetch:
+                            rows = cursor.fetchall()
+                            self.metrics.add("rows_fetched", type(self).__name__, len(rows))
+                            return rows
+                        self.metrics.add("rows_affected", type(self).__name__, max(cursor.rowcount, 0))
+                        return cursor.rowcount
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                if attempt < attempts:
+                    self.logger.warning("Соединение потеряно, повторное подключение: %s", e)
+                    continue
+                self.logger.error("Ошибка выполнения запроса: %s", e)
+                return None
+            except psycopg2.IntegrityError as e:
+                self.logger.warning("Нарушено ограничение %s: %s", e.diag.constraint_name, e.diag.message_detail)
+                return None
+            except psycopg2.Error as e:
+                self.logger.error("Ошибка выполнения запроса: %s", e)
+                return None
+            except Exception as e:
+                self.logger.exception("Общая ошибка: %s", e)
+                return None
+
+    def execute_prepared(self, name, params=(), fetch=False, retry=None):
+        query = f"EXECUTE {name}"
+        if params:
+            query += f" ({', '.join(['%s'] * len(params))})"
+        return self.execute_query(query, params, fetch, prepare=name, retry=retry)
+
+    def cache_stats(self):
+        return {"clients": self.cache.stats(), "count": self.count_cache.stats()}
+
+    def clear_cache(self):
+        self.cache.clear()
+        self.count_cache.clear()
+
+    def check_schema_marker(self):
+        result = self.execute_query("SELECT obj_description('client'::regclass, 'pg_class')", fetch=True)
+        trusted = bool(result) and result[0][0] == self.SCHEMA_MARKER
+        if not trusted:
+            self.logger.info("Метка схемы не найдена, строки из базы будут проверяться")
+        return trusted
+
+    def mark_schema_version(self):
+        return self.execute_query(f"COMMENT ON TABLE client IS '{self.SCHEMA_MARKER}'") is not None
+
+    def _client_from_row(self, row):
+        if self.trusted:
+            return Client.from_trusted_row(row)
+        return Client(**dict(zip(Client.FIELDS, row)))
+
+    @timed("fetch_batch")
+    def _fetch_batch(self, cursor, batch_size):
+        # замеряется сама выборка пачки, а не обработка клиентов вызывающим кодом
+        rows = cursor.fetchmany(batch_size)
+        self.metrics.add("rows_fetched", type(self).__name__, len(rows))
+        return rows
+
+    def iter_clients(self, batch_size=None):
+        # именованный курсор держит соединение из пула, пока генератор не исчерпан или не закрыт
+        batch_size = batch_size or self.fetch_batch_size
+        with self._transaction(name="client_stream") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(self.SELECT_CLIENT)
+            while True:
+                rows = self._fetch_batch(cursor, batch_size)
+                if not rows:
+                    break
+                if self.trusted:
+                    yield from map(Client.from_trusted_row, rows)
+                    continue
+                clients, errors = Client.validate_many(dict(zip(Client.FIELDS, row)) for row in rows)
+                for i, message in errors:
+                    self.logger.warning("Пропущена некорректная запись %s: %s", rows[i][0], message)
+                yield from clients
+
+    @timed("load")
     def _read_all_from_file(self):
-        print(f"Чтение всех клиентов из базы данных")
-        query = "SELECT client_id, last_name, first_name, otch, address, phone, email, driver_license FROM client"
-        result = self.execute_query(query, fetch=True)
+        self.logger.debug("Чтение всех клиентов из базы данных")
         clients_list = []
-        if result:
-            for row in result:
-                client = Client(
-                    client_id=row[0],
-                    last_name=row[1],
-                    first_name=row[2],
-                    otch=row[3],
-                    address=row[4],
-                    phone=row[5],
-                    email=row[6],
-                    driver_license=row[7]
-                )
-                clients_list.append(client)
-        print(f"Успешно прочитано {len(clients_list)} клиентов из базы данных")
+        try:
+            clients_list.extend(self.iter_clients())
+        except psycopg2.Error as e:
+            self.logger.error("Ошибка чтения клиентов: %s", e)
+        self.logger.info("Успешно прочитано %d клиентов из базы данных", len(clients_list))
         return clients_list
 
     def _write_all_to_file(self):
-        print("Запись")
         return True
 
     def get_max_client_id(self):
@@ -79,32 +275,51 @@ class ClientRepDB:
             return result[0][0]
         return 0
 
+    @timed("get_by_id")
     def get_by_id(self, client_id: int):
-        print(f"Поиск клиента с ID: {client_id}")
-        query = """
-        SELECT client_id, last_name, first_name, otch, address, phone, email, driver_license 
-        FROM client WHERE client_id = %s
-        """
-        result = self.execute_query(query, (client_id,), fetch=True)
+        self.logger.debug("Поиск клиента с ID: %s", client_id)
+        version = self.cache.version
+        client = self.cache.get(client_id)
+        if client is not None:
+            self.logger.debug("Найден клиент в кэше: %s", client)
+            return client
+        result = self.execute_prepared("client_get_by_id", (client_id,), fetch=True)
         if result and len(result) > 0:
-            row = result[0]
-            client = Client(
-                client_id=row[0],
-                last_name=row[1],
-                first_name=row[2],
-                otch=row[3],
-                address=row[4],
-                phone=row[5],
-                email=row[6],
-                driver_license=row[7]
-            )
-            print(f"Найден клиент: {client.full_repr()}")
+            client = self._client_from_row(result[0])
+            self.cache.fill(client_id, client, version)
+            self.logger.debug("Найден клиент: %s", client)
             return client
-        print(f"Клиент с ID {client_id} не найден")
+        self.logger.debug("Клиент с ID %s не найден", client_id)
         return None
 
+    def _log_short_list(self, short_list, page):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        self.logger.debug("Получено %d клиентов (страница %s):", len(short_list), page)
+        for i, client in enumerate(short_list, 1):
+            self.logger.debug("   %d. %s", i, client)
+
+    @staticmethod
+    def _short_from_row(row):
+        contact = row[5] if row[5] else row[4]
+        return ClientShort(
+            client_id=row[0],
+            last_name=row[1],
+            first_name=row[2],
+            otch=row[3],
+            contact=contact
+        )
+
+    @staticmethod
+    def _order_by(field, reverse=False):
+        check_sort_field(field)
+        if reverse:
+            return f"ORDER BY {field} DESC NULLS LAST, client_id DESC"
+        return f"ORDER BY {field} ASC NULLS FIRST, client_id ASC"
+
+    @timed("get_k_n_short_list")
     def get_k_n_short_list(self, n: int, k: int):
-        print(f"Получение {k} клиентов на странице {n}")
+        self.logger.debug("Получение %s клиентов на странице %s", k, n)
         offset = (n - 1) * k
         query = """
         SELECT client_id, last_name, first_name, otch, phone, email
@@ -113,82 +328,197 @@ class ClientRepDB:
         LIMIT %s OFFSET %s
         """
         result = self.execute_query(query, (k, offset), fetch=True)
-        short_clients = []
-        for row in result:
-            contact = row[5] if row[5] else row[4]
-            short_client = ClientShort(
-                client_id=row[0],
-                last_name=row[1],
-                first_name=row[2],
-                otch=row[3],
-                contact=contact
-            )
-            short_clients.append(short_client)
+        short_clients = [self._short_from_row(row) for row in result or []]
 
-        print(f"Получено {len(short_clients)} клиентов (страница {n}):")
-        for i, client in enumerate(short_clients, 1):
-            print(f"   {i}. {client}")
+        self._log_short_list(short_clients, n)
         return short_clients
 
-    def sort_by_field(self, field="last_name", reverse=False):
-        print(f"Сортировка по полю '{field}' ({'по убыванию' if reverse else 'по возрастанию'})")
+    @timed("get_sorted_page")
+    def get_sorted_page(self, field="last_name", page=1, size=10, reverse=False):
+        self.logger.debug("Получение страницы %s по %s клиентов, сортировка по полю %s", page, size, field)
+        offset = (page - 1) * size
+        query = f"""
+        SELECT client_id, last_name, first_name, otch, phone, email
+        FROM client
+        {self._order_by(field, reverse)}
+        LIMIT %s OFFSET %s
+        """
+        result = None
+        if offset >= 0 and size > 0:
+            result = self.execute_query(query, (size, offset), fetch=True)
+        short_clients = [self._short_from_row(row) for row in result or []]
 
-        valid_fields = Client.FIELDS
-        if field not in valid_fields:
-            error_msg = f"Недопустимое поле для сортировки: {field}. Допустимые поля: {valid_fields}"
-            print(error_msg)
-            raise ValueError(error_msg)
+        self._log_short_list(short_clients, page)
+        return short_clients
 
-        query = f"SELECT client_id, last_name, first_name, otch, address, phone, email, driver_license FROM client"
-        result = self.execute_query(query, fetch=True)
+    @classmethod
+    def _seek_expr(cls, field):
+        check_sort_field(field)
+        if field in cls.NULLABLE_FIELDS:
+            return f"COALESCE({field}, '')"
+        return field
+
+    @staticmethod
+    def encode_page_token(field, reverse, key, client_id):
+        raw = json.dumps([field, reverse, key, client_id], ensure_ascii=False).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
 
+    @staticmethod
+    def decode_page_token(token):
+        try:
+            field, reverse, key, client_id = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        except (ValueError, TypeError):
+            raise ValueError("Некорректный токен продолжения")
+        return field, reverse, key, client_id
+
+    def create_sort_indexes(self):
+        for field in Client.FIELDS:
+            if field == "client_id":
+                continue
+            query = f"CREATE INDEX IF NOT EXISTS client_{field}_seek_idx ON client (({self._seek_expr(field)}), client_id)"
+            self.execute_query(query)
+        self.logger.info("Индексы для постраничной выборки созданы")
+
+    def create_unique_indexes(self):
+        # в схеме поля объявлены UNIQUE, индекс нужен, если таблица создана без ограничений
+        for field in UNIQUE_FIELDS:
+            self.execute_query(f"CREATE UNIQUE INDEX IF NOT EXISTS client_{field}_key_idx ON client ({field})")
+        self.logger.info("Уникальные индексы по телефону, email и удостоверению созданы")
+
+    def _get_by_unique(self, field, value):
+        self.logger.debug("Поиск клиента по полю %s: %s", field, value)
+        version = self.cache.version
+        result = self.execute_prepared(f"client_get_by_{field}", (value,), fetch=True)
         if not result:
-            print("В базе нет клиентов для сортировки")
+            self.logger.debug("Клиент со значением %s не найден", value)
+            return None
+        client = self._client_from_row(result[0])
+        self.cache.fill(client.client_id, client, version)
+        self.logger.debug("Найден клиент: %s", client)
+        return client
+
+    @timed("get_by_phone")
+    def get_by_phone(self, phone: str):
+        return self._get_by_unique("phone", phone)
+
+    @timed("get_by_email")
+    def get_by_email(self, email: str):
+        return self._get_by_unique("email", email)
+
+    @timed("get_by_license")
+    def get_by_license(self, driver_license: str):
+        return self._get_by_unique("driver_license", driver_license)
+
+    def create_search_indexes(self):
+        # text_pattern_ops позволяет искать LIKE 'префикс%' по индексу при любой локали базы
+        for field in SEARCH_FIELDS:
+            self.execute_query(
+                f"CREATE INDEX IF NOT EXISTS client_{field}_prefix_idx ON client (lower({field}) text_pattern_ops)"
+            )
+        self.logger.info("Индексы для поиска по ФИО созданы")
+
+    @staticmethod
+    def _like_prefix(word):
+        return word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+    @timed("search")
+    def search(self, query: str, limit=10):
+        # каждое слово запроса - начало фамилии, имени или отчества
+        self.logger.debug("Поиск клиентов по запросу '%s'", query)
+        words = query.casefold().split()
+        if not words or limit <= 0:
             return []
 
-        sort_list = []
-        clients_map = {}
+        conditions = []
+        params = []
+        for word in words:
+            conditions.append("(" + " OR ".join(f"lower({field}) LIKE %s" for field in SEARCH_FIELDS) + ")")
+            params.extend([self._like_prefix(word)] * len(SEARCH_FIELDS))
+        sql = f"""
+        SELECT client_id, last_name, first_name, otch, phone, email
+        FROM client
+        WHERE {" AND ".join(conditions)}
+        ORDER BY last_name, first_name, client_id
+        LIMIT %s
+        """
+        result = self.execute_query(sql, (*params, limit), fetch=True)
+        short_clients = [self._short_from_row(row) for row in result or []]
+        self.logger.debug("Найдено клиентов: %d", len(short_clients))
+        return short_clients
 
-        for row in result:
-            client = Client(
-                client_id=row[0],
-                last_name=row[1],
-                first_name=row[2],
-                otch=row[3],
-                address=row[4],
-                phone=row[5],
-                email=row[6],
-                driver_license=row[7]
-            )
-            clients_map[row[0]] = client
+    @timed("get_page_after")
+    def get_page_after(self, size=10, field="client_id", after_id=None, token=None, reverse=False):
+        expr = self._seek_expr(field)
+        after = None
+        if token is not None:
+            token_field, reverse, key, last_id = self.decode_page_token(token)
+            if token_field != field:
+                raise ValueError(f"Токен продолжения выдан для поля {token_field}, а не {field}")
+            after = (key, last_id)
+        elif after_id is not None:
+            if field != "client_id":
+                raise ValueError("after_id можно использовать только при сортировке по client_id")
+            after = (after_id, after_id)
+        if size <= 0:
+            return [], None
+
+        direction = "DESC" if reverse else "ASC"
+        where = ""
+        params = []
+        if after is not None:
+            where = f"WHERE ({expr}, client_id) {'<' if reverse else '>'} (%s, %s)"
+            params.extend(after)
+        params.append(size)
+
+        query = f"""
+        SELECT client_id, last_name, first_name, otch, phone, email, {expr}
+        FROM client
+        {where}
+        ORDER BY {expr} {direction}, client_id {direction}
+        LIMIT %s
+        """
+        result = self.execute_query(query, tuple(params), fetch=True) or []
+        short_clients = [self._short_from_row(row) for row in result]
 
-            value = getattr(client, field)
+        next_token = None
+        if len(result) == size:
+            last = result[-1]
+            next_token = self.encode_page_token(field, reverse, last[6], last[0])
 
-            if value is None:
-                if field == "client_id":
-                    key = 0  
-                else:
-                    key = ""  
-            else:
-                key = value
+        self.logger.debug("Получено %d клиентов после курсора", len(short_clients))
+        return short_clients, next_token
 
-            sort_list.append((key, row[0]))
+    @timed("sort_by_field")
+    def sort_by_field(self, field="last_name", reverse=False):
+        self.logger.debug("Сортировка по полю '%s' (%s)", field, "по убыванию" if reverse else "по возрастанию")
+
+        try:
+            order_by = self._order_by(field, reverse)
+        except ValueError as e:
+            self.logger.error("%s", e)
+            raise
+
+        query = f"SELECT client_id, last_name, first_name, otch, address, phone, email, driver_license FROM client {order_by}"
+        result = self.execute_query(query, fetch=True)
 
-        sort_list.sort(key=lambda x: x[0], reverse=reverse)
+        if not result:
+            self.logger.debug("В базе нет клиентов для сортировки")
+            return []
 
-        sorted_clients = [clients_map[client_id] for key, client_id in sort_list]
+        sorted_clients = [self._client_from_row(row) for row in result]
 
-        print("Список отсортирован:")
-        for i, client in enumerate(sorted_clients, 1):
-            print(f"   {i}. {client.short_repr()}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Список отсортирован:")
+            for i, client in enumerate(sorted_clients, 1):
+                self.logger.debug("   %d. %s", i, client.short_repr())
 
         return sorted_clients
 
+    @timed("add_client")
     def add_client(self, client_data: dict):
-        print("Добавление нового клиента")
+        self.logger.debug("Добавление нового клиента")
         try:
-            max_id = self.get_max_client_id()
-            new_id = max_id + 1
+            new_id = self.next_client_id()
 
             client = Client(
                 client_id=new_id,
@@ -201,50 +531,105 @@ class ClientRepDB:
                 email=client_data.get("email")
             )
 
-            query = """
-            INSERT INTO client (client_id, last_name, first_name, otch, address, phone, email, driver_license)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            # в базу пишутся проверенные поля, как в add_clients_bulk: доверенное чтение их не нормализует
+            query = f"""
+            INSERT INTO client ({", ".join(Client.FIELDS)})
+            VALUES ({", ".join(["%s"] * len(Client.FIELDS))})
             """
-            params = (
-                new_id,
-                client_data["last_name"],
-                client_data["first_name"],
-                client_data.get("otch"),
-                client_data["address"],
-                client_data["phone"],
-                client_data.get("email"),
-                client_data["driver_license"]
-            )
+            params = tuple(getattr(client, field) for field in Client.FIELDS)
             result = self.execute_query(query, params)
 
             if result:
-                new_client = Client(
-                    client_id=new_id,
-                    last_name=client_data["last_name"],
-                    first_name=client_data["first_name"],
-                    address=client_data["address"],
-                    phone=client_data["phone"],
-                    driver_license=client_data["driver_license"],
-                    otch=client_data.get("otch"),
-                    email=client_data.get("email")
-                )
-                print(f"Клиент успешно добавлен с ID {new_id}: {new_client.full_repr()}")
-                return new_client
+                # в кэш попадает тот же объект, поля которого записаны в строку
+                self.cache.set(new_id, client)
+                self.count_cache.clear()
+                self.logger.debug("Клиент успешно добавлен с ID %s: %s", new_id, client)
+                return client
             return None
         except ValueError as e:
-            print(f"Ошибка валидации: {e}")
+            self.logger.warning("Ошибка валидации: %s", e)
             return None
         except Exception as e:
-            print(f"Ошибка при добавлении: {e}")
+            self.logger.error("Ошибка при добавлении: %s", e)
             return None
 
-    def replace_by_id(self, client_id: int, new_data: dict):
-        print(f"Замена клиента с ID: {client_id}")
+    def ensure_id_sequence(self):
+        if self._id_sequence_ready:
+            return
+        with self._transaction() as cursor:
+            # блокировка таблицы, чтобы два процесса не создали последовательность одновременно
+            cursor.execute("LOCK TABLE client IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute("SELECT to_regclass(%s)", (self.ID_SEQUENCE,))
+            created = cursor.fetchone()[0] is None
+            if created:
+                cursor.execute(f"CREATE SEQUENCE {self.ID_SEQUENCE} OWNED BY client.client_id")
+                cursor.execute(f"SELECT setval('{self.ID_SEQUENCE}', COALESCE(MAX(client_id), 0) + 1, false) FROM client")
+                cursor.execute(f"ALTER TABLE client ALTER COLUMN client_id SET DEFAULT nextval('{self.ID_SEQUENCE}')")
+        self._id_sequence_ready = True
+        if created:
+            self.logger.info("Создана последовательность %s", self.ID_SEQUENCE)
+
+    def next_client_id(self):
+        self.ensure_id_sequence()
+        result = self.execute_query(f"SELECT nextval('{self.ID_SEQUENCE}')", fetch=True)
+        if not result:
+            raise psycopg2.OperationalError("Не удалось получить новый ID клиента")
+        return result[0][0]
+
+    @timed("add_clients_bulk")
+    def add_clients_bulk(self, records, batch_size=1000):
+        self.logger.debug("Пакетное добавление клиентов")
+        records = list(records)
+        inserted_ids = []
+        rejected = []
+        query = f"""
+        INSERT INTO client ({", ".join(Client.FIELDS)})
+        VALUES %s
+        ON CONFLICT DO NOTHING
+        RETURNING client_id
+        """
 
-        existing_client = self.get_by_id(client_id)
-        if not existing_client:
-            print(f"Клиент с ID {client_id} не найден")
-            return False
+        try:
+            self.ensure_id_sequence()
+            with self._transaction() as cursor:
+                for batch_start in range(0, len(records), batch_size):
+                    # до выдачи ID вместо него стоит номер записи + 1; не словари отклоняет validate_rows
+                    batch = [dict(item, client_id=batch_start + i + 1) if isinstance(item, dict) else item
+                             for i, item in enumerate(records[batch_start:batch_start + batch_size])]
+                    valid, errors = Client.validate_rows(batch)
+                    rejected.extend((batch_start + i, message) for i, message in errors)
+                    if not valid:
+                        continue
+
+                    cursor.execute(
+                        f"SELECT nextval('{self.ID_SEQUENCE}') FROM generate_series(1, %s)", (len(valid),)
+                    )
+                    positions = {}
+                    rows = []
+                    for (position, *fields), (new_id,) in zip(valid, cursor.fetchall()):
+                        positions[new_id] = position - 1
+                        rows.append((new_id, *fields))
+                    returned = execute_values(cursor, query, rows, page_size=len(rows), fetch=True)
+                    batch_ids = {row[0] for row in returned}
+                    for row in rows:
+                        if row[0] in batch_ids:
+                            inserted_ids.append(row[0])
+                        else:
+                            rejected.append((positions[row[0]], "Телефон, email или удостоверение уже есть в базе"))
+        except psycopg2.Error as e:
+            self.logger.error("Ошибка пакетного добавления, транзакция отменена: %s", e)
+            return [], rejected
+
+        if inserted_ids:
+            self.count_cache.clear()
+            self.metrics.add("rows_affected", type(self).__name__, len(inserted_ids))
+        rejected.sort()
+        self.logger.info("Добавлено %d клиентов, отклонено %d", len(inserted_ids), len(rejected))
+        return inserted_ids, rejected
+
+    @timed("replace_by_id")
+    def replace_by_id(self, client_id: int, new_data: dict):
+        self.logger.debug("Замена клиента с ID: %s", client_id)
 
         try:
             new_data["client_id"] = client_id
@@ -260,71 +645,84 @@ class ClientRepDB:
                 email=new_data.get("email")
             )
 
-            query = """
-            UPDATE client 
-            SET last_name = %s, first_name = %s, otch = %s, address = %s, 
-                phone = %s, email = %s, driver_license = %s
+            query = f"""
+            UPDATE client
+            SET {", ".join(f"{field} = %s" for field in Client.FIELDS[1:])}
             WHERE client_id = %s
             """
-            params = (
-                new_data["last_name"],
-                new_data["first_name"],
-                new_data.get("otch"),
-                new_data["address"],
-                new_data["phone"],
-                new_data.get("email"),
-                new_data["driver_license"],
-                client_id
-            )
+            params = tuple(getattr(updated_client, field) for field in Client.FIELDS[1:]) + (client_id,)
+            # наличие клиента проверяется по rowcount, без отдельного SELECT перед UPDATE
             rows_affected = self.execute_query(query, params)
             if rows_affected:
-                print(f"Клиент с ID {client_id} успешно заменен: {updated_client.full_repr()}")
+                self.cache.set(client_id, updated_client)
+                self.logger.debug("Клиент с ID %s успешно заменен: %s", client_id, updated_client)
                 return True
+            self.cache.invalidate(client_id)
+            if rows_affected == 0:
+                self.logger.debug("Клиент с ID %s не найден", client_id)
             return False
         except ValueError as e:
-            print(f"Ошибка валидации данных: {e}")
+            self.logger.warning("Ошибка валидации данных: %s", e)
             return False
         except Exception as e:
-            print(f"Ошибка при замене клиента: {e}")
+            self.logger.error("Ошибка при замене клиента: %s", e)
             return False
 
+    @timed("delete_by_id")
     def delete_by_id(self, client_id: int):
-        print(f"Удаление клиента с ID: {client_id}")
+        self.logger.debug("Удаление клиента с ID: %s", client_id)
 
-        client_to_delete = self.get_by_id(client_id)
-        if not client_to_delete:
-            print(f"Клиент с ID {client_id} не найден")
+        result = self.execute_prepared("client_delete_by_id", (client_id,), fetch=True, retry=False)
+        self.cache.invalidate(client_id)
+        if result is None:
+            return False
+        if not result:
+            self.logger.debug("Клиент с ID %s не найден", client_id)
             return False
 
-        query = "DELETE FROM client WHERE client_id = %s"
-        rows_affected = self.execute_query(query, (client_id,))
-        if rows_affected:
-            print(f"Клиент с ID {client_id} успешно удален: {client_to_delete.short_repr()}")
-            return True
-        return False
+        self.count_cache.clear()
+        deleted_client = Client.from_trusted_row(result[0])
+        self.logger.debug("Клиент с ID %s успешно удален: %s", client_id, deleted_client)
+        return True
 
+    @timed("get_count")
     def get_count(self):
-        query = "SELECT COUNT(*) FROM client"
-        result = self.execute_query(query, fetch=True)
-        count = result[0][0] if result else 0
-        print(f"Количество клиентов в базе: {count}")
+        version = self.count_cache.version
+        count = self.count_cache.get("count")
+        if count is None:
+            result = self.execute_prepared("client_count", fetch=True)
+            count = result[0][0] if result else 0
+            if result:
+                self.count_cache.fill("count", count, version)
+        self.logger.debug("Количество клиентов в базе: %d", count)
         return count
 
     def display_all_clients(self):
-        clients = self._read_all_from_file()
         print("\nсписок клиентов:")
-        if not clients:
+        count = 0
+        try:
+            for count, client in enumerate(self.iter_clients(), 1):
+                print(f"   {count}. {client.full_repr()}")
+        except psycopg2.Error as e:
+            print(f"Ошибка чтения клиентов: {e}")
+        if not count:
             print("   Список пуст")
-        for i, client in enumerate(clients, 1):
-            print(f"   {i}. {client.full_repr()}")
 
     def close(self):
-        if self.connection:
-            self.connection.close()
-            print("Соединение с базой данных закрыто")
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
+            # ключи - id() закрытых соединений, новые соединения могут получить те же id()
+            self._last_used.clear()
+            self._prepared.clear()
+            self.logger.info("Соединения с базой данных закрыты")
 
 
 if __name__ == "__main__":
+    from logs import enable_console_logging
+
+    enable_console_logging(logging.DEBUG)
+
     try:
         repo_db = ClientRepDB(
             host='localhost',
@@ -0,0 +1,308 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+from client import Client
+from indexes import IndexedClients, LiveSlots
+from logs import get_logger
+from metrics import registry, timed
+
+
+MMAP_MAGIC = b"CLM1"
+MMAP_VERSION = 1
+MMAP_NONE = 0xFF
+FLAG_EMPTY = 0
+FLAG_LIVE = 1
+
+# ширина полей в байтах UTF-8, порядок совпадает с Client.FIELDS без client_id
+FIELD_WIDTHS = {
+    "last_name": 64,
+    "first_name": 64,
+    "otch": 64,
+    "address": 254,
+    "phone": 12,
+    "email": 128,
+    "driver_license": 10,
+}
+
+HEADER = struct.Struct("<4sHHIII")
+HEADER_SIZE = 64
+RECORD = struct.Struct("<BI" + "".join(f"B{width}s" for width in FIELD_WIDTHS.values()))
+
+
+class ClientRepMMap(IndexedClients):
+    # запись клиента с ID n лежит в слоте n - 1, поэтому поиск по ID - это вычисление смещения;
+    # удалённые записи помечаются флагом и не сдвигают соседние
+    logger = get_logger("mmap")
+    metrics = registry
+
+    def __init__(self, filename: str, initial_capacity=1024, sync=True):
+        self.filename = filename
+        self.sync = sync
+        self._lock = threading.RLock()
+        self._reset_indexes()
+        self._live = None
+
+        new = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        self._mm = None
+        self._file = open(filename, "w+b" if new else "r+b")
+        try:
+            if new:
+                self._file.truncate(HEADER_SIZE + initial_capacity * RECORD.size)
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+
+            if new:
+                self.count = 0
+                self.capacity = initial_capacity
+                self.last_id = 0
+                self._write_header()
+            else:
+                self._read_header()
+        except BaseException:
+            self.close()
+            raise
+        self.logger.info("Открыто хранилище %s: %d клиентов", filename, self.count)
+
+    def _read_header(self):
+        # обрезанный или чужой файл не должен доходить до чтения слотов
+        error = ValueError(f"Файл {self.filename} не является хранилищем клиентов версии {MMAP_VERSION}")
+        if len(self._mm) < HEADER_SIZE:
+            raise error
+        magic, version, record_size, self.count, self.capacity, self.last_id = HEADER.unpack_from(self._mm, 0)
+        if magic != MMAP_MAGIC or version != MMAP_VERSION or record_size != RECORD.size:
+            raise error
+        if self.count > self.last_id or self.last_id > self.capacity or len(self._mm) < self._offset(self.capacity):
+            raise error
+
+    def _write_header(self):
+        HEADER.pack_into(self._mm, 0, MMAP_MAGIC, MMAP_VERSION, RECORD.size, self.count, self.capacity, self.last_id)
+
+    def _flush(self, slot):
+        # msync только страниц заголовка и изменённого слота, а не всего отображения
+        if not self.sync:
+            return
+        granularity = mmap.ALLOCATIONGRANULARITY
+        start = self._offset(slot) // granularity * granularity
+        if start > 0:
+            self._mm.flush(0, HEADER_SIZE)
+        self._mm.flush(start, self._offset(slot + 1) - start)
+
+    @staticmethod
+    def _offset(slot):
+        return HEADER_SIZE + slot * RECORD.size
+
+    def _grow(self, min_capacity):
+        capacity = max(self.capacity * 2, min_capacity)
+        self._mm.flush()
+        self._mm.close()
+        self._file.truncate(self._offset(capacity))
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self.capacity = capacity
+        self._write_header()
+
+    @staticmethod
+    def _pack_record(client):
+        values = []
+        for field, width in FIELD_WIDTHS.items():
+            value = getattr(client, field)
+            if value is None:
+                values.extend((MMAP_NONE, b""))
+                continue
+            data = value.encode("utf-8")
+            if len(data) > width:
+                raise ValueError(f"Поле {field} не должно быть длиннее {width} байт")
+            values.extend((len(data), data))
+        return RECORD.pack(FLAG_LIVE, client.client_id, *values)
+
+    def _read_slot(self, slot):
+        flag, client_id, *values = RECORD.unpack_from(self._mm, self._offset(slot))
+        if flag != FLAG_LIVE:
+            return None
+        row = [client_id]
+        for i in range(0, len(values), 2):
+            length, data = values[i], values[i + 1]
+            row.append(None if length == MMAP_NONE else data[:length].decode("utf-8"))
+        return Client.from_trusted_row(row)
+
+    def _is_live(self, slot):
+        return self._mm[self._offset(slot)] == FLAG_LIVE
+
+    def _write_client(self, client):
+        slot = client.client_id - 1
+        if slot >= self.capacity:
+            self._grow(slot + 1)
+        self._mm[self._offset(slot):self._offset(slot + 1)] = self._pack_record(client)
+        self.metrics.add("bytes_written", type(self).__name__, RECORD.size)
+
+    def iter_clients(self):
+        slot = 0
+        while slot < self.last_id:
+            with self._lock:
+                c = self._read_slot(slot)
+            if c is not None:
+                yield c
+            slot += 1
+
+    def _find(self, client_id):
+        slot = client_id - 1
+        if slot < 0 or slot >= self.last_id:
+            return None
+        return self._read_slot(slot)
+
+    def _client_by_id(self, client_id):
+        return self._read_slot(client_id - 1)
+
+    @timed("get_by_id")
+    def get_by_id(self, client_id: int):
+        self.logger.debug("Поиск клиента с ID: %s", client_id)
+        with self._lock:
+            c = self._find(client_id)
+        if c is None:
+            self.logger.debug("Клиент с ID %s не найден", client_id)
+            return None
+        self.logger.debug("Найден клиент: %s", c)
+        return c
+
+    def _live_slots(self):
+        # после удалений номер слота не совпадает с позицией: дерево по флагам строится один раз
+        # при первой такой странице и дальше поддерживается в add_client и delete_by_id
+        if self._live is None:
+            self._live = LiveSlots(self._is_live(slot) for slot in range(self.last_id))
+        return self._live
+
+    @timed("get_k_n_short_list")
+    def get_k_n_short_list(self, n: int, k: int):
+        self.logger.debug("Получение %s клиентов на странице %s", k, n)
+        short_list = []
+        start = (n - 1) * k
+        if start >= 0 and k > 0:
+            with self._lock:
+                if self.count == self.last_id:
+                    slots = range(start, min(start + k, self.last_id))
+                else:
+                    live = self._live_slots()
+                    slots = [live.select(rank) for rank in range(start, min(start + k, live.count))]
+                short_list = [self._read_slot(slot).to_short() for slot in slots]
+
+        self._log_short_list(short_list, n)
+        return short_list
+
+    @timed("add_client")
+    def add_client(self, client_data: dict):
+        self.logger.debug("Добавление нового клиента")
+
+        with self._lock:
+            new_id = self.last_id + 1
+            client_data["client_id"] = new_id
+            try:
+                new_client = Client(
+                    client_id=client_data["client_id"],
+                    last_name=client_data["last_name"],
+                    first_name=client_data["first_name"],
+                    otch=client_data.get("otch"),
+                    address=client_data["address"],
+                    phone=client_data["phone"],
+                    driver_license=client_data["driver_license"],
+                    email=client_data.get("email")
+                )
+                self._check_unique(new_client)
+                self._write_client(new_client)
+            except ValueError as e:
+                self.logger.warning("Ошибка валидации: %s", e)
+                return None
+            except KeyError as e:
+                self.logger.warning("Отсутствует обязательное поле: %s", e)
+                return None
+
+            self.last_id = new_id
+            self.count += 1
+            if self._live is not None:
+                self._live.append()
+            self._write_header()
+            self._flush(new_id - 1)
+            self._update_indexes(new_client=new_client)
+
+        self.logger.debug("Клиент успешно добавлен с ID %s: %s", new_id, new_client)
+        return new_client
+
+    @timed("replace_by_id")
+    def replace_by_id(self, client_id: int, new_data: dict):
+        self.logger.debug("Замена клиента с ID: %s", client_id)
+
+        with self._lock:
+            old_client = self._find(client_id)
+            if old_client is None:
+                self.logger.debug("Клиент с ID %s не найден", client_id)
+                return False
+
+            new_data["client_id"] = client_id
+            try:
+                updated_client = Client(
+                    client_id=new_data["client_id"],
+                    last_name=new_data["last_name"],
+                    first_name=new_data["first_name"],
+                    otch=new_data.get("otch"),
+                    address=new_data["address"],
+                    phone=new_data["phone"],
+                    driver_license=new_data["driver_license"],
+                    email=new_data.get("email")
+                )
+                self._check_unique(updated_client)
+                self._write_client(updated_client)
+            except ValueError as e:
+                self.logger.warning("Ошибка валидации: %s", e)
+                return False
+            except KeyError as e:
+                self.logger.warning("Отсутствует обязательное поле: %s", e)
+                return False
+
+            self._flush(client_id - 1)
+            self._update_indexes(old_client, updated_client)
+
+        self.logger.debug("Клиент с ID %s успешно заменен: %s", client_id, updated_client)
+        return True
+
+    @timed("delete_by_id")
+    def delete_by_id(self, client_id: int):
+        self.logger.debug("Удаление клиента с ID: %s", client_id)
+
+        with self._lock:
+            deleted_client = self._find(client_id)
+            if deleted_client is None:
+                self.logger.debug("Клиент с ID %s не найден", client_id)
+                return False
+
+            self._mm[self._offset(client_id - 1)] = FLAG_EMPTY
+            self.count -= 1
+            if self._live is not None:
+                self._live.remove(client_id - 1)
+            self._write_header()
+            self._flush(client_id - 1)
+            self._update_indexes(old_client=deleted_client)
+
+        self.logger.debug("Клиент с ID %s удален: %s", client_id, deleted_client)
+        return True
+
+    @timed("get_count")
+    def get_count(self):
+        count = self.count
+        self.logger.debug("Количество клиентов в репозитории: %d", count)
+        return count
+
+    def close(self):
+        if self._mm is not None and not self._mm.closed:
+            self._mm.flush()
+            self._mm.close()
+        self._file.close()
+
+
+if __name__ == "__main__":
+    from inheritance import test_repository
+    from logs import enable_console_logging
+
+    enable_console_logging(logging.DEBUG)
+
+    repo_mmap = ClientRepMMap("clients.mmap")
+    test_repository(repo_mmap, "Репозиторий в отображаемом файле")
+    repo_mmap.close()
@@ -0,0 +1,161 @@
+import atexit
+import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+
+
+DURABILITY_LEVELS = ("none", "file", "dir")
+
+# писатели с отложенной записью; при выходе из программы их изменения сбрасываются на диск
+_delayed_writers = weakref.WeakSet()
+
+
+@atexit.register
+def flush_pending_writers():
+    # ошибка одного писателя не мешает сбросить остальные, первая пробрасывается в конце
+    errors = []
+    for writer in list(_delayed_writers):
+        try:
+            writer.flush()
+        except Exception as e:
+            errors.append(e)
+    if errors:
+        raise errors[0]
+
+
+def check_durability(durability):
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f"Недопустимый уровень надёжности: {durability}. Допустимые: {DURABILITY_LEVELS}")
+
+
+def fsync_dir(directory: str):
+    # в Windows каталог нельзя открыть для fsync, переименование там и так надёжно
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(filename: str, data: bytes, durability="file"):
+    # пишем во временный файл рядом с целевым и подменяем его через os.replace:
+    # после сбоя на диске остаётся либо старая, либо новая версия целиком
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(filename) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if durability != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(filename).st_mode & 0o7777)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, filename)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if durability == "dir":
+        fsync_dir(directory)
+
+
+class DurableWriter:
+    def __init__(self, filename: str, durability="file", commit_delay=0.0):
+        check_durability(durability)
+        self.filename = filename
+        self.durability = durability
+        self.commit_delay = commit_delay
+        self._lock = threading.RLock()
+        self._timer_lock = threading.Lock()
+        self._timer = None
+        self._pending = None
+        self._held = 0
+        self.error = None
+        self.requests = 0
+        self.writes = 0
+        if commit_delay > 0:
+            _delayed_writers.add(self)
+
+    def write(self, produce):
+        # снимок данных собирается под той же блокировкой, что и запись,
+        # иначе более старый снимок может перезаписать более новый
+        with self._lock:
+            data = produce()
+            atomic_write(self.filename, data, self.durability)
+            self.writes += 1
+        return data
+
+    def schedule(self, flush):
+        self.requests += 1
+        if self.commit_delay <= 0:
+            with self._lock:
+                flush()
+            return
+        with self._timer_lock:
+            self._pending = flush
+            self._arm()
+
+    def _arm(self):
+        # вызывается под self._timer_lock
+        if self._timer is None and not self._held:
+            self._timer = threading.Timer(self.commit_delay, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @contextmanager
+    def hold(self):
+        # пока идёт пакет, в памяти незафиксированное состояние: снимок остаётся ожидающим
+        # и пишется таймером, взведённым заново после выхода из пакета
+        with self._lock:
+            self._held += 1
+        try:
+            yield
+        finally:
+            with self._lock, self._timer_lock:
+                self._held -= 1
+                if self._pending is not None and self.commit_delay > 0:
+                    self._arm()
+
+    def _flush_in_background(self):
+        # изменения уже подтверждены вызывающему: неудавшийся снимок остаётся ожидающим
+        # и повторяется при следующем flush() или close(), где ошибка и пробрасывается
+        try:
+            self.flush()
+        except Exception as e:
+            self.error = e
+
+    def flush(self):
+        # ожидающий блокировку таймер остаётся в self._timer, поэтому изменения во время записи
+        # не плодят новые таймеры, а дожидаются одного следующего сброса
+        with self._lock:
+            with self._timer_lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if self._held:
+                    return
+                flush, self._pending = self._pending, None
+            if flush is None:
+                return
+            try:
+                flush()
+            except BaseException:
+                with self._timer_lock:
+                    if self._pending is None:
+                        self._pending = flush
+                raise
+            self.error = None
+
+    @property
+    def pending(self):
+        return self._pending is not None
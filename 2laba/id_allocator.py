@@ -0,0 +1,44 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def seq_filename(filename: str):
+    return filename + ".seq"
+
+
+class IdAllocator:
+    def __init__(self, filename: str, start=0):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._last = max(self._read(), start)
+
+    def _read(self):
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def next_id(self):
+        # счётчик в файле защищён блокировкой, чтобы соседние процессы не выдали тот же id
+        with self._lock:
+            fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, "r+", encoding="utf-8") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    stored = int(f.read().strip() or 0)
+                except ValueError:
+                    stored = 0
+                new_id = max(stored, self._last) + 1
+                f.seek(0)
+                f.truncate()
+                f.write(str(new_id))
+                f.flush()
+            self._last = new_id
+            return new_id
@@ -0,0 +1,376 @@
+import logging
+from bisect import bisect_left, insort
+from contextlib import nullcontext
+
+from client import Client
+from metrics import timed
+
+
+def sort_key(field, value):
+    if value is None:
+        return 0 if field == "client_id" else ""
+    return value
+
+
+def check_sort_field(field):
+    if field not in Client.FIELDS:
+        raise ValueError(f"Недопустимое поле для сортировки: {field}. Допустимые поля: {Client.FIELDS}")
+
+
+class SortedIndex:
+    def __init__(self, field, clients=()):
+        self.field = field
+        self._keys = sorted(self._entry(c) for c in clients)
+
+    def _entry(self, client):
+        return sort_key(self.field, getattr(client, self.field)), client.client_id
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, client):
+        insort(self._keys, self._entry(client))
+
+    def remove(self, client):
+        entry = self._entry(client)
+        i = bisect_left(self._keys, entry)
+        if i < len(self._keys) and self._keys[i] == entry:
+            del self._keys[i]
+
+    def replace(self, old_client, new_client):
+        self.remove(old_client)
+        self.add(new_client)
+
+    def ids(self, start=0, stop=None, reverse=False):
+        n = len(self._keys)
+        stop = n if stop is None else min(stop, n)
+        if start >= stop:
+            return []
+        if reverse:
+            entries = self._keys[n - stop:n - start]
+            entries.reverse()
+        else:
+            entries = self._keys[start:stop]
+        return [client_id for key, client_id in entries]
+
+
+# поля, уникальные по схеме базы, и их названия для сообщений об ошибках
+UNIQUE_FIELDS = {
+    "phone": "Телефон",
+    "email": "Email",
+    "driver_license": "Водительское удостоверение",
+}
+
+
+class UniqueIndex:
+    # значение поля -> ID клиента; пустой email не индексируется, в файле таких клиентов может быть много.
+    # Старые файлы могут содержать повторы: тогда значение хранит множество ID, и каждый владелец
+    # сохраняет его при замене, пока не удалены все, а новый клиент с таким значением не принимается
+    def __init__(self, field, entries=()):
+        self.field = field
+        self._ids = {}
+        self.duplicates = 0
+        for client_id, value in entries:
+            if value and self._add(value, client_id):
+                self.duplicates += 1
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _holders(self, value):
+        holders = self._ids.get(value) if value else None
+        if holders is None:
+            return ()
+        return holders if isinstance(holders, set) else (holders,)
+
+    def _add(self, value, client_id):
+        # True, если значение уже было у другого клиента
+        holders = self._ids.setdefault(value, client_id)
+        if holders == client_id:
+            return False
+        if not isinstance(holders, set):
+            holders = self._ids[value] = {holders}
+        shared = client_id not in holders
+        holders.add(client_id)
+        return shared
+
+    def get(self, value):
+        return min(self._holders(value), default=None)
+
+    def check(self, client):
+        value = getattr(client, self.field)
+        holders = self._holders(value)
+        if holders and client.client_id not in holders:
+            raise ValueError(f"{UNIQUE_FIELDS[self.field]} {value} уже указан у клиента с ID {min(holders)}")
+
+    def add(self, client):
+        value = getattr(client, self.field)
+        if value:
+            self._add(value, client.client_id)
+
+    def remove(self, client):
+        value = getattr(client, self.field)
+        holders = self._ids.get(value) if value else None
+        if holders == client.client_id:
+            del self._ids[value]
+        elif isinstance(holders, set) and client.client_id in holders:
+            holders.discard(client.client_id)
+            if len(holders) == 1:
+                self._ids[value] = holders.pop()
+
+
+SEARCH_FIELDS = ("last_name", "first_name", "otch")
+
+
+def search_tokens(*names):
+    # слова фамилии, имени и отчества без учёта регистра
+    return {word for name in names if name for word in name.casefold().split()}
+
+
+def matches_words(tokens, words):
+    return all(any(token.startswith(word) for token in tokens) for word in words)
+
+
+class PrefixIndex:
+    # отсортированные пары (слово, ID): все слова с префиксом лежат подряд и находятся бинарным поиском
+    def __init__(self, entries=()):
+        self._keys = sorted((token, client_id) for client_id, *names in entries for token in search_tokens(*names))
+
+    @staticmethod
+    def _tokens(client):
+        return search_tokens(*(getattr(client, field) for field in SEARCH_FIELDS))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, client):
+        for token in self._tokens(client):
+            insort(self._keys, (token, client.client_id))
+
+    def remove(self, client):
+        for token in self._tokens(client):
+            entry = (token, client.client_id)
+            i = bisect_left(self._keys, entry)
+            if i < len(self._keys) and self._keys[i] == entry:
+                del self._keys[i]
+
+    def count(self, prefix):
+        # число слов с префиксом: по нему выбирается самое редкое слово запроса
+        return bisect_left(self._keys, (prefix + "\U0010ffff",)) - bisect_left(self._keys, (prefix,))
+
+    def ids(self, prefix):
+        # ID в порядке найденных слов, каждый один раз
+        seen = set()
+        keys = self._keys
+        for i in range(bisect_left(keys, (prefix,)), len(keys)):
+            token, client_id = keys[i]
+            if not token.startswith(prefix):
+                break
+            if client_id not in seen:
+                seen.add(client_id)
+                yield client_id
+
+
+class LiveSlots:
+    # дерево Фенвика над флагами занятых позиций: удаление не сдвигает соседей,
+    # а позиция k-го живого элемента находится спуском по дереву за O(log N)
+    def __init__(self, flags=()):
+        tree = [0]
+        tree.extend(1 if live else 0 for live in flags)
+        self.count = sum(tree)
+        n = len(tree) - 1
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def append(self, live=True):
+        # узел i хранит сумму флагов на отрезке (i - lowbit(i), i]
+        i = len(self._tree)
+        total = 1 if live else 0
+        low = i - (i & -i)
+        j = i - 1
+        while j > low:
+            total += self._tree[j]
+            j -= j & -j
+        self._tree.append(total)
+        self.count += 1 if live else 0
+
+    def _change(self, slot, delta):
+        i = slot + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+        self.count += delta
+
+    def add(self, slot):
+        self._change(slot, 1)
+
+    def remove(self, slot):
+        self._change(slot, -1)
+
+    def select(self, rank):
+        # позиция живого элемента с номером rank (с нуля); len(self), если столько элементов нет
+        if rank < 0 or rank >= self.count:
+            return len(self)
+        tree = self._tree
+        pos = 0
+        step = 1 << (len(self).bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= rank:
+                pos = nxt
+                rank -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+class IndexedClients:
+    # сортированные, уникальные и поисковый индексы, поиск, сортировка и страницы по ним, общие для
+    # файлового движка и отображаемого файла; хранилище даёт iter_clients(), _client_by_id(), logger и metrics
+    _lock = nullcontext()
+
+    def _reset_indexes(self):
+        self._sorted = {}
+        self._unique = None
+        self._search = None
+
+    def _field_entries(self, *fields):
+        return ((c.client_id, *(getattr(c, field) for field in fields)) for c in self.iter_clients())
+
+    def _sorted_index(self, field):
+        check_sort_field(field)
+        index = self._sorted.get(field)
+        if index is None:
+            index = SortedIndex(field, self.iter_clients())
+            self._sorted[field] = index
+        return index
+
+    def _unique_indexes(self):
+        # строятся при первом поиске или изменении, дальше поддерживаются вместе с сортированными
+        if self._unique is None:
+            self._unique = {field: UniqueIndex(field, self._field_entries(field)) for field in UNIQUE_FIELDS}
+            for field, index in self._unique.items():
+                if index.duplicates:
+                    self.logger.warning("Повторяющихся значений поля %s в файле: %d", field, index.duplicates)
+        return self._unique
+
+    def _check_unique(self, client):
+        for index in self._unique_indexes().values():
+            index.check(client)
+
+    def _update_indexes(self, old_client=None, new_client=None):
+        indexes = list(self._sorted.values())
+        if self._unique is not None:
+            indexes.extend(self._unique.values())
+        if self._search is not None:
+            indexes.append(self._search)
+        for index in indexes:
+            if old_client is not None:
+                index.remove(old_client)
+            if new_client is not None:
+                index.add(new_client)
+
+    def iter_sorted(self, field="last_name", reverse=False):
+        for client_id in self._sorted_index(field).ids(reverse=reverse):
+            yield self._client_by_id(client_id)
+
+    def _log_short_list(self, short_list, page):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        self.logger.debug("Получено %d клиентов (страница %s):", len(short_list), page)
+        for i, client in enumerate(short_list, 1):
+            self.logger.debug("   %d. %s", i, client)
+
+    def _get_by_unique(self, field, value):
+        self.logger.debug("Поиск клиента по полю %s: %s", field, value)
+        with self._lock:
+            client_id = self._unique_indexes()[field].get(value)
+            c = self._client_by_id(client_id) if client_id is not None else None
+        if c is None:
+            self.logger.debug("Клиент со значением %s не найден", value)
+            return None
+        self.logger.debug("Найден клиент: %s", c)
+        return c
+
+    @timed("get_by_phone")
+    def get_by_phone(self, phone: str):
+        return self._get_by_unique("phone", phone)
+
+    @timed("get_by_email")
+    def get_by_email(self, email: str):
+        return self._get_by_unique("email", email)
+
+    @timed("get_by_license")
+    def get_by_license(self, driver_license: str):
+        return self._get_by_unique("driver_license", driver_license)
+
+    @timed("search")
+    def search(self, query: str, limit=10):
+        # каждое слово запроса - начало фамилии, имени или отчества; по индексу ищется самое редкое
+        self.logger.debug("Поиск клиентов по запросу '%s'", query)
+        words = query.casefold().split()
+        short_list = []
+        if words and limit > 0:
+            with self._lock:
+                if self._search is None:
+                    self._search = PrefixIndex(self._field_entries(*SEARCH_FIELDS))
+                key = min(words, key=self._search.count)
+                for client_id in self._search.ids(key):
+                    c = self._client_by_id(client_id)
+                    if len(words) > 1 and not matches_words(search_tokens(c.last_name, c.first_name, c.otch), words):
+                        continue
+                    short_list.append(c.to_short())
+                    if len(short_list) >= limit:
+                        break
+        self.logger.debug("Найдено клиентов: %d", len(short_list))
+        return short_list
+
+    @timed("get_sorted_page")
+    def get_sorted_page(self, field="last_name", page=1, size=10, reverse=False):
+        self.logger.debug("Получение страницы %s по %s клиентов, сортировка по полю %s", page, size, field)
+        check_sort_field(field)
+        start = (page - 1) * size
+        stop = start + size
+        if start < 0 or size <= 0:
+            start = stop = 0
+
+        with self._lock:
+            # индекс строится при первом вызове и дальше поддерживается при изменениях
+            index = self._sorted_index(field)
+            page_clients = [self._client_by_id(client_id) for client_id in index.ids(start, stop, reverse)]
+
+        short_list = [client.to_short() for client in page_clients]
+        self._log_short_list(short_list, page)
+        return short_list
+
+    @timed("sort_by_field")
+    def sort_by_field(self, field="last_name", reverse=False):
+        self.logger.debug("Сортировка по полю '%s' (%s)", field, "по убыванию" if reverse else "по возрастанию")
+
+        try:
+            with self._lock:
+                sorted_clients = list(self.iter_sorted(field, reverse))
+        except ValueError as e:
+            self.logger.error("%s", e)
+            raise
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Список отсортирован:")
+            for i, client in enumerate(sorted_clients, 1):
+                self.logger.debug("   %d. %s", i, client.short_repr())
+
+        return sorted_clients
+
+    def display_all_clients(self):
+        print("\n текущий список клиентов:")
+        count = 0
+        for count, client in enumerate(self.iter_clients(), 1):
+            print(f"   {count}. {client.full_repr()}")
+        if not count:
+            print("Список пуст")
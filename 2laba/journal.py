@@ -0,0 +1,64 @@
+import json
+import os
+
+from durable_io import atomic_write, check_durability, fsync_dir
+
+
+class Journal:
+    def __init__(self, filename: str, durability="file"):
+        check_durability(durability)
+        self.filename = filename
+        self.durability = durability
+        self.count = 0
+        self.dropped = 0
+
+    def _write(self, lines, mode="a"):
+        # уровень надёжности тот же, что у снимка: fsync файла, а для "dir" и каталога при создании файла
+        created = self.durability == "dir" and not os.path.exists(self.filename)
+        with open(self.filename, mode, encoding="utf-8") as f:
+            f.writelines(lines)
+            if self.durability != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        if created:
+            fsync_dir(os.path.dirname(os.path.abspath(self.filename)))
+
+    def append(self, record: dict):
+        self._write([json.dumps(record, ensure_ascii=False) + "\n"])
+        self.count += 1
+
+    def extend(self, records):
+        lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in records]
+        self._write(lines)
+        self.count += len(lines)
+
+    def replay(self):
+        # запись считается целой, только если строка разобралась и закончилась переводом строки;
+        # оборванные при сбое строки выбрасываются из файла, иначе новые записи легли бы после них
+        records = []
+        self.dropped = 0
+        try:
+            with open(self.filename, "rb") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line) if line.endswith(b"\n") else None
+            except ValueError:
+                record = None
+            if isinstance(record, dict):
+                records.append(record)
+            else:
+                self.dropped += 1
+        if self.dropped:
+            data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            atomic_write(self.filename, data.encode("utf-8"), self.durability)
+        self.count = len(records)
+        return records
+
+    def clear(self):
+        self._write([], mode="w")
+        self.count = 0
@@ -0,0 +1,20 @@
+import logging
+import sys
+
+
+# по умолчанию сообщения никуда не выводятся, приложение само подключает обработчики
+logger = logging.getLogger("clients")
+logger.addHandler(logging.NullHandler())
+
+
+def get_logger(name: str):
+    return logger.getChild(name)
+
+
+def enable_console_logging(level=logging.INFO, stream=None):
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return handler
+
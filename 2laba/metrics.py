@@ -0,0 +1,224 @@
+import bisect
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+from functools import wraps
+
+
+# верхние границы корзин гистограммы задержек в секундах
+LATENCY_BUCKETS = (0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "errors", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        # как histogram_quantile в Prometheus: линейная интерполяция внутри корзины
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "sum_ms": self.sum * 1e3,
+            "max_ms": self.max * 1e3,
+            "p50_ms": self.quantile(0.5) * 1e3,
+            "p95_ms": self.quantile(0.95) * 1e3,
+            "p99_ms": self.quantile(0.99) * 1e3
+        }
+
+
+class Metrics:
+    def __init__(self, enabled=False, prefix="clients"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._counters = {}
+        self._profiles = {}
+        self._hooks = []
+        self._local = threading.local()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._counters.clear()
+
+    def observe(self, repository, operation, seconds, error=False):
+        key = (repository, operation)
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram()
+            histogram.observe(seconds, error)
+        for hook in self._hooks:
+            hook(repository, operation, seconds, error)
+
+    def add(self, name, repository, value=1):
+        if not self.enabled:
+            return
+        key = (name, repository)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def add_hook(self, hook):
+        # hook(repository, operation, seconds, error) вызывается после каждой измеренной операции
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def histogram(self, repository, operation):
+        return self._latency.get((repository, operation))
+
+    def counter(self, name, repository):
+        return self._counters.get((name, repository), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "operations": {f"{repository}.{operation}": histogram.to_dict()
+                               for (repository, operation), histogram in sorted(self._latency.items())},
+                "counters": {f"{repository}.{name}": value
+                             for (name, repository), value in sorted(self._counters.items())}
+            }
+
+    def to_prometheus(self):
+        name = f"{self.prefix}_operation_seconds"
+        lines = [f"# HELP {name} Время выполнения операций репозитория",
+                 f"# TYPE {name} histogram"]
+        errors = []
+        with self._lock:
+            for (repository, operation), histogram in sorted(self._latency.items()):
+                labels = f'repository="{repository}",operation="{operation}"'
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS, histogram.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.9f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+                errors.append(f"{self.prefix}_operation_errors_total{{{labels}}} {histogram.errors}")
+            counters = sorted(self._counters.items())
+
+        if errors:
+            lines.append(f"# TYPE {self.prefix}_operation_errors_total counter")
+            lines.extend(errors)
+        current = None
+        for (counter, repository), value in counters:
+            metric = f"{self.prefix}_{counter}_total"
+            if metric != current:
+                lines.append(f"# TYPE {metric} counter")
+                current = metric
+            lines.append(f'{metric}{{repository="{repository}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def profile(self, operation):
+        # следующие вызовы операции выполняются под cProfile, статистика накапливается
+        with self._lock:
+            return self._profiles.setdefault(operation, cProfile.Profile())
+
+    def stop_profile(self, operation):
+        with self._lock:
+            return self._profiles.pop(operation, None)
+
+    def profiler(self, operation):
+        # вложенные операции не профилируются отдельно: cProfile в потоке может быть только один
+        if not self._profiles or getattr(self._local, "profiling", False):
+            return None
+        return self._profiles.get(operation)
+
+    def run_profiled(self, profiler, func, *args, **kwargs):
+        self._local.profiling = True
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            self._local.profiling = False
+
+    def profile_stats(self, operation, sort="cumulative", limit=20):
+        profiler = self._profiles.get(operation)
+        if profiler is None:
+            return ""
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump_profile(self, operation, filename):
+        profiler = self._profiles.get(operation)
+        if profiler is None:
+            raise KeyError(f"Операция {operation} не профилируется")
+        profiler.dump_stats(filename)
+
+
+registry = Metrics()
+
+
+def timed(operation: str):
+    # замер нужен, только если включены метрики, профилирование операции или DEBUG-журнал;
+    # иначе обёртка лишь проверяет эти условия
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            debug = self.logger.isEnabledFor(logging.DEBUG)
+            profiler = metrics.profiler(operation)
+            if not (metrics.enabled or debug or profiler is not None):
+                return func(self, *args, **kwargs)
+            error = True
+            start = time.perf_counter()
+            try:
+                if profiler is not None:
+                    result = metrics.run_profiled(profiler, func, self, *args, **kwargs)
+                else:
+                    result = func(self, *args, **kwargs)
+                error = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                repository = type(self).__name__
+                if metrics.enabled:
+                    metrics.observe(repository, operation, elapsed, error)
+                if debug:
+                    self.logger.debug("%s выполнена за %.3f мс", operation, elapsed * 1e3, extra={
+                        "operation": operation,
+                        "elapsed_ms": elapsed * 1e3,
+                        "repository": repository
+                    })
+        return wrapper
+    return decorator
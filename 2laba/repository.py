@@ -0,0 +1,448 @@
+import os
+from contextlib import contextmanager
+from itertools import islice
+from operator import attrgetter
+from client import Client
+from durable_io import DurableWriter
+from id_allocator import IdAllocator, seq_filename
+from indexes import IndexedClients, LiveSlots
+from journal import Journal
+from logs import get_logger
+from metrics import registry, timed
+from snapshot_meta import is_trusted, write_meta
+from streaming import LazyClientList, row_from_dict
+
+
+client_row = attrgetter(*Client.FIELDS)
+
+# столько записей ленивой загрузки проверяются за раз
+LAZY_BATCH = 4096
+
+
+class ClientRepository(IndexedClients):
+    # хранилище держит индексы, пакеты и запись на диск, а формат файла задают наследники
+    # через _encode(rows) и _decode(raw); строки - кортежи в порядке Client.FIELDS или словари
+    format_name = None
+    decode_errors = (ValueError,)
+    lenient = False
+    logger = get_logger("repository")
+    metrics = registry
+
+    def __init__(self, filename: str, journal=False, compact_every=1000, lazy=False, chunk_size=65536,
+                 trusted_load=False, durability="file", commit_delay=0.0):
+        self.filename = filename
+        self._writer = DurableWriter(filename, durability, commit_delay)
+        self.trusted_load = trusted_load
+        self.lazy = lazy
+        self.chunk_size = chunk_size
+        self.journal = Journal(filename + ".journal", durability) if journal else None
+        self.compact_every = compact_every
+        self.load_errors = []
+        self.clients = self._read_all_from_file()
+        self._index = {}
+        self._holes = 0
+        self._live = None
+        self._reset_indexes()
+        self._batch_ops = None
+        self._rebuild_index()
+        self._report_load_errors()
+        if self.journal:
+            self._replay_journal()
+        self._ids = IdAllocator(seq_filename(filename), max(self._index, default=0))
+
+    def _encode(self, rows):
+        raise NotImplementedError
+
+    def _decode(self, raw):
+        raise NotImplementedError
+
+    def _iter_records(self, f):
+        # для ленивой загрузки; форматы с потоковым разбором переопределяют
+        return self._decode_records(f.read())
+
+    def _decode_records(self, raw):
+        # файл целиком должен быть списком, отдельные записи проверяются при валидации
+        data = self._decode(raw) if raw else None
+        if data is None:
+            return []
+        if not isinstance(data, list):
+            raise ValueError(f"Ожидался список клиентов, получен {type(data).__name__}")
+        return data
+
+    def _rebuild_index(self):
+        self._index = {}
+        for i in range(len(self.clients)):
+            client_id = self._client_id_at(i)
+            if client_id is not None:
+                self._index[client_id] = i
+
+    def _client_id_at(self, i):
+        if self.lazy:
+            return self.clients.client_id_at(i)
+        c = self.clients[i]
+        return None if c is None else c.client_id
+
+    def _append_client(self, client):
+        self.clients.append(client)
+        self._index[client.client_id] = len(self.clients) - 1
+        if self._live is not None:
+            self._live.append()
+
+    def _remove_at(self, pos):
+        # удалённая позиция остаётся пустой (None), соседи не сдвигаются и индекс по ID не пересчитывается;
+        # список сжимается, когда пустых позиций становится больше, чем клиентов
+        client = self.clients[pos]
+        self.clients[pos] = None
+        self._holes += 1
+        if self._live is not None:
+            self._live.remove(pos)
+        if self._holes > len(self._index):
+            self._compact_positions()
+        return client
+
+    def _compact_positions(self):
+        if self.lazy:
+            self.clients.compact()
+        else:
+            self.clients = [c for c in self.clients if c is not None]
+        self._holes = 0
+        self._live = None
+        self._rebuild_index()
+
+    def _live_slots(self):
+        # строится при первой странице после удаления, дальше поддерживается при добавлении и удалении
+        if self._live is None:
+            flags = [False] * len(self.clients)
+            for pos in self._index.values():
+                flags[pos] = True
+            self._live = LiveSlots(flags)
+        return self._live
+
+    def _report_load_errors(self):
+        if not self.load_errors:
+            return
+        self.logger.warning("Пропущено некорректных записей: %d", len(self.load_errors))
+        for i, message in self.load_errors:
+            self.logger.warning("   запись %d: %s", i, message)
+
+    def _clients_from_data(self, data, raw):
+        if self.trusted_load and is_trusted(self.filename, raw):
+            self.logger.info("Контрольная сумма совпала, повторная валидация пропущена")
+            return [Client.from_trusted_row(item) for item in data]
+        if data and isinstance(data[0], tuple):
+            data = [dict(zip(Client.FIELDS, row)) for row in data]
+        clients_list, self.load_errors = Client.validate_many(data)
+        return clients_list
+
+    @staticmethod
+    def _client_from_dict(item):
+        return Client(
+            client_id=item["client_id"],
+            last_name=item["last_name"],
+            first_name=item["first_name"],
+            otch=item.get("otch"),
+            address=item["address"],
+            phone=item["phone"],
+            driver_license=item["driver_license"],
+            email=item.get("email")
+        )
+
+    @staticmethod
+    def _client_to_dict(c):
+        return {
+            "client_id": c.client_id,
+            "last_name": c.last_name,
+            "first_name": c.first_name,
+            "otch": c.otch,
+            "address": c.address,
+            "phone": c.phone,
+            "email": c.email,
+            "driver_license": c.driver_license
+        }
+
+    def _build_client(self, data: dict):
+        # мягкие репозитории сообщают об ошибке и возвращают None, остальные пробрасывают её
+        try:
+            client = self._client_from_dict(data)
+            self._check_unique(client)
+            return client
+        except ValueError as e:
+            if not self.lenient:
+                raise
+            self.logger.warning("Ошибка валидации: %s", e)
+        except KeyError as e:
+            if not self.lenient:
+                raise
+            self.logger.warning("Отсутствует обязательное поле: %s", e)
+        return None
+
+    @timed("load")
+    def _read_all_from_file(self):
+        self.logger.debug("Чтение файла %s (%s)", self.filename, self.format_name)
+        try:
+            if self.lazy:
+                clients_list = self._read_lazy_from_file()
+            else:
+                with open(self.filename, "rb") as f:
+                    raw = f.read()
+                self.metrics.add("bytes_read", type(self).__name__, len(raw))
+                data = self._decode_records(raw)
+                clients_list = self._clients_from_data(data, raw) if data else []
+        except FileNotFoundError:
+            self.logger.info("Файл не найден, создан пустой список")
+            return LazyClientList() if self.lazy else []
+        except self.decode_errors as e:
+            self.logger.error("Ошибка чтения %s, создан пустой список: %s", self.format_name, e)
+            return LazyClientList() if self.lazy else []
+        self.metrics.add("rows_read", type(self).__name__, len(clients_list))
+        self.logger.info("Успешно прочитано %d клиентов из %s", len(clients_list), self.filename)
+        return clients_list
+
+    def _read_lazy_from_file(self):
+        # записи проверяются пачками по мере разбора, как при обычной загрузке,
+        # в памяти остаются только нормализованные кортежи
+        trusted = self.trusted_load and is_trusted(self.filename)
+        rows = []
+        with open(self.filename, "rb") as f:
+            self.metrics.add("bytes_read", type(self).__name__, os.fstat(f.fileno()).st_size)
+            records = iter(self._iter_records(f))
+            if trusted:
+                rows = [row if isinstance(row, tuple) else row_from_dict(row) for row in records]
+            else:
+                offset = 0
+                for batch in iter(lambda: list(islice(records, LAZY_BATCH)), []):
+                    if isinstance(batch[0], tuple):
+                        batch = [dict(zip(Client.FIELDS, row)) for row in batch]
+                    valid, errors = Client.validate_rows(batch)
+                    rows.extend(valid)
+                    self.load_errors.extend((offset + i, message) for i, message in errors)
+                    offset += len(batch)
+        return LazyClientList(rows, trusted=True)
+
+    def _encode_all(self):
+        if self.lazy:
+            rows = list(self.clients.iter_rows())
+        else:
+            rows = [client_row(c) for c in list(self.clients) if c is not None]
+        return self._encode(rows)
+
+    @timed("flush")
+    def _write_all_to_file(self):
+        self.logger.debug("Запись в файл %s (%s)", self.filename, self.format_name)
+        try:
+            data = self._writer.write(self._encode_all)
+            write_meta(self.filename, data)
+        except Exception as e:
+            self.logger.error("Ошибка при записи %s: %s", self.format_name, e)
+            raise
+        self.metrics.add("flushes", type(self).__name__)
+        self.metrics.add("bytes_written", type(self).__name__, len(data))
+        self.logger.debug("Успешно записано %d клиентов в %s", len(self._index), self.filename)
+        return True
+
+    def _replay_journal(self):
+        records = self.journal.replay()
+        if self.journal.dropped:
+            self.logger.warning("Из журнала удалено оборванных записей: %d", self.journal.dropped)
+        for record in records:
+            if record["op"] == "delete":
+                pos = self._index.pop(record["client_id"], None)
+                if pos is not None:
+                    self._remove_at(pos)
+            else:
+                client = self._client_from_dict(record["client"])
+                pos = self._index.get(client.client_id)
+                if pos is None:
+                    self._append_client(client)
+                else:
+                    self.clients[pos] = client
+        if records:
+            self.logger.info("Из журнала восстановлено %d изменений", len(records))
+
+    def _persist(self, op, client=None, client_id=None):
+        if self._batch_ops is not None:
+            self._batch_ops.append((op, client, client_id))
+            return
+        self._commit([(op, client, client_id)])
+
+    def _commit(self, ops):
+        if self.journal is None:
+            self._writer.schedule(self._write_all_to_file)
+            return
+        records = []
+        for op, client, client_id in ops:
+            if op == "delete":
+                records.append({"op": op, "client_id": client_id})
+            else:
+                records.append({"op": op, "client": self._client_to_dict(client)})
+        self.journal.extend(records)
+        self.metrics.add("journal_records", type(self).__name__, len(records))
+        if self.journal.count >= self.compact_every:
+            self.compact()
+
+    @contextmanager
+    def batch(self):
+        # вложенный batch() присоединяется к внешнему
+        if self._batch_ops is not None:
+            yield self
+            return
+        saved = (self.clients.copy(), dict(self._index), self._holes)
+        self._batch_ops = []
+        with self._writer.hold():
+            try:
+                yield self
+            except BaseException:
+                self._batch_ops = None
+                self.clients, self._index, self._holes = saved
+                self._live = None
+                self._reset_indexes()
+                raise
+        ops, self._batch_ops = self._batch_ops, None
+        if ops:
+            self._commit(ops)
+
+    @timed("compact")
+    def compact(self):
+        if self.journal:
+            self.logger.info("Сжатие журнала: %d записей", self.journal.count)
+        self._write_all_to_file()
+        if self.journal:
+            self.journal.clear()
+
+    def flush(self):
+        if self._writer.pending:
+            self.logger.debug("Запись отложенных изменений")
+        self._writer.flush()
+
+    def close(self):
+        self.flush()
+
+    def iter_clients(self):
+        if self.lazy:
+            yield from self.clients.iter_clients()
+        else:
+            for c in self.clients:
+                if c is not None:
+                    yield c
+
+    def _field_entries(self, *fields):
+        if self.lazy:
+            positions = [Client.FIELDS.index(field) for field in fields]
+            return ((row[0], *(row[i] for i in positions)) for row in self.clients.iter_rows())
+        return super()._field_entries(*fields)
+
+    def _client_by_id(self, client_id):
+        return self.clients[self._index[client_id]]
+
+    @timed("get_by_id")
+    def get_by_id(self, client_id: int):
+        self.logger.debug("Поиск клиента с ID: %s", client_id)
+        pos = self._index.get(client_id)
+        if pos is None:
+            self.logger.debug("Клиент с ID %s не найден", client_id)
+            return None
+        c = self.clients[pos]
+        self.logger.debug("Найден клиент: %s", c)
+        return c
+
+    @timed("get_k_n_short_list")
+    def get_k_n_short_list(self, n: int, k: int):
+        self.logger.debug("Получение %s клиентов на странице %s", k, n)
+        start = max((n - 1) * k, 0)
+        end = max(n * k, 0)
+        if self._holes:
+            live = self._live_slots()
+            page_clients = [self.clients[live.select(rank)] for rank in range(start, min(end, live.count))]
+        else:
+            page_clients = self.clients[start:end]
+        short_list = [client.to_short() for client in page_clients]
+        self._log_short_list(short_list, n)
+        return short_list
+
+    @timed("add_client")
+    def add_client(self, client_data: dict):
+        self.logger.debug("Добавление нового клиента")
+
+        new_id = self._ids.next_id()
+        client_data["client_id"] = new_id
+        new_client = self._build_client(client_data)
+        if new_client is None:
+            return None
+
+        self._append_client(new_client)
+        self._update_indexes(new_client=new_client)
+        self._persist("add", client=new_client)
+        self.logger.debug("Клиент успешно добавлен с ID %s: %s", new_id, new_client)
+        return new_client
+
+    @timed("replace_by_id")
+    def replace_by_id(self, client_id: int, new_data: dict):
+        self.logger.debug("Замена клиента с ID: %s", client_id)
+
+        pos = self._index.get(client_id)
+        if pos is None:
+            self.logger.debug("Клиент с ID %s не найден", client_id)
+            return False
+
+        new_data["client_id"] = client_id
+        updated_client = self._build_client(new_data)
+        if updated_client is None:
+            return False
+
+        old_client = self.clients[pos]
+        self.clients[pos] = updated_client
+        self._update_indexes(old_client, updated_client)
+        self._persist("replace", client=updated_client)
+        self.logger.debug("Клиент с ID %s успешно заменен: %s", client_id, updated_client)
+        return True
+
+    @timed("delete_by_id")
+    def delete_by_id(self, client_id: int):
+        self.logger.debug("Удаление клиента с ID: %s", client_id)
+
+        pos = self._index.pop(client_id, None)
+        if pos is None:
+            self.logger.debug("Клиент с ID %s не найден", client_id)
+            return False
+
+        deleted_client = self._remove_at(pos)
+        self._update_indexes(old_client=deleted_client)
+        self._persist("delete", client_id=client_id)
+        self.logger.debug("Клиент с ID %s удален: %s", client_id, deleted_client)
+        return True
+
+    @timed("add_clients")
+    def add_clients(self, records):
+        self.logger.debug("Пакетное добавление %d клиентов", len(records))
+        with self.batch():
+            added = [self.add_client(client_data) for client_data in records]
+        self.logger.debug("Добавлено клиентов: %d", sum(1 for c in added if c is not None))
+        return added
+
+    @timed("replace_many")
+    def replace_many(self, updates: dict):
+        self.logger.debug("Пакетная замена %d клиентов", len(updates))
+        with self.batch():
+            replaced = sum(1 for client_id, new_data in updates.items() if self.replace_by_id(client_id, new_data))
+        self.logger.debug("Заменено клиентов: %d", replaced)
+        return replaced
+
+    @timed("delete_by_ids")
+    def delete_by_ids(self, client_ids):
+        client_ids = list(client_ids)
+        self.logger.debug("Пакетное удаление клиентов: %s", client_ids)
+        found = [client_id for client_id in dict.fromkeys(client_ids) if client_id in self._index]
+        if found:
+            with self.batch():
+                for client_id in found:
+                    deleted_client = self._remove_at(self._index.pop(client_id))
+                    self._update_indexes(old_client=deleted_client)
+                    self._persist("delete", client_id=client_id)
+        self.logger.debug("Удалено клиентов: %d", len(found))
+        return len(found)
+
+    @timed("get_count")
+    def get_count(self):
+        count = len(self._index)
+        self.logger.debug("Количество клиентов в репозитории: %d", count)
+        return count
@@ -0,0 +1,49 @@
+import hashlib
+import json
+
+from client import Client
+from durable_io import atomic_write
+
+
+SCHEMA_VERSION = 1
+
+
+def meta_filename(filename: str):
+    return filename + ".meta"
+
+
+def checksum(data: bytes):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_checksum(filename: str, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_meta(filename: str, data: bytes, durability="none"):
+    meta = {
+        "schema_version": SCHEMA_VERSION,
+        "fields": Client.FIELDS,
+        "sha256": checksum(data)
+    }
+    atomic_write(meta_filename(filename), json.dumps(meta).encode("utf-8"), durability)
+
+
+def read_meta(filename: str):
+    try:
+        with open(meta_filename(filename), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_trusted(filename: str, data: bytes = None):
+    meta = read_meta(filename)
+    if not meta or meta.get("schema_version") != SCHEMA_VERSION or meta.get("fields") != Client.FIELDS:
+        return False
+    actual = checksum(data) if data is not None else file_checksum(filename)
+    return meta.get("sha256") == actual
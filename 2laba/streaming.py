@@ -0,0 +1,179 @@
+import json
+from collections.abc import MutableSequence
+
+from client import Client
+
+
+WHITESPACE = " \t\r\n"
+NUMBER_END = WHITESPACE + ",]"
+
+
+def _unexpected_end(buf):
+    return json.JSONDecodeError("Неожиданный конец файла", buf, len(buf))
+
+
+class _ArrayReader:
+    # элементы разбираются пачками: json.loads над срезом буфера до последней "}";
+    # срез может закончиться внутри строки, тогда этот участок буфера разбирается поэлементно
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = f.read(chunk_size)
+        self.pos = 0
+        self.slow_until = -1
+
+    def shift(self):
+        self.slow_until -= self.pos
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+
+    def _read_more(self):
+        more = self.f.read(self.chunk_size)
+        self.shift()
+        self.buf += more
+        return bool(more)
+
+    def skip_whitespace(self):
+        # False, если файл закончился
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return True
+            if not self._read_more():
+                return False
+
+    def next_char(self):
+        if not self.skip_whitespace():
+            raise _unexpected_end(self.buf)
+        return self.buf[self.pos]
+
+    def read_items(self):
+        buf, pos = self.buf, self.pos
+        if pos > self.slow_until:
+            cut = buf.rfind("}", pos)
+            if cut >= 0:
+                try:
+                    items = json.loads("[" + buf[pos:cut + 1] + "]")
+                except json.JSONDecodeError:
+                    self.slow_until = cut
+                else:
+                    self.pos = cut + 1
+                    return items
+        return [self._read_item()]
+
+    def _read_item(self):
+        # элемент, упёршийся в конец буфера, мог быть разрезан, поэтому дочитываем;
+        # число считается целым, только если за ним уже виден разделитель: "0." - начало "0.96"
+        while True:
+            error = None
+            try:
+                item, end = self.decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) and (
+                        not isinstance(item, (int, float)) or self.buf[end] in NUMBER_END):
+                    self.pos = end
+                    return item
+            except json.JSONDecodeError as e:
+                error = e
+            if not self._read_more():
+                raise error or _unexpected_end(self.buf)
+
+
+def iter_json_array(f, chunk_size=65536):
+    # синтаксис строже, чем раньше, и совпадает с json.load: ровно одна запятая между элементами,
+    # после закрывающей скобки - только пробелы
+    reader = _ArrayReader(f, chunk_size)
+    if not reader.skip_whitespace():
+        return
+    if reader.buf[reader.pos] != "[":
+        raise json.JSONDecodeError("Ожидался массив клиентов", reader.buf, reader.pos)
+    reader.pos += 1
+
+    char = reader.next_char()
+    while char != "]":
+        yield from reader.read_items()
+        char = reader.next_char()
+        if char == ",":
+            reader.pos += 1
+            reader.next_char()
+            if reader.pos > chunk_size:
+                reader.shift()
+        elif char != "]":
+            raise json.JSONDecodeError("Ожидалась запятая между клиентами", reader.buf, reader.pos)
+
+    reader.pos += 1
+    if reader.skip_whitespace():
+        raise json.JSONDecodeError("Лишние данные после массива клиентов", reader.buf, reader.pos)
+
+
+def row_from_dict(item):
+    return tuple(map(item.get, Client.FIELDS))
+
+
+def client_from_row(row, trusted=False):
+    if trusted:
+        return Client.from_trusted_row(row)
+    return Client(**dict(zip(Client.FIELDS, row)))
+
+
+class LazyClientList(MutableSequence):
+    def __init__(self, rows=None, trusted=False):
+        self._items = list(rows) if rows is not None else []
+        self.trusted = trusted
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self._items)))]
+        item = self._items[i]
+        if isinstance(item, tuple):
+            item = client_from_row(item, self.trusted)
+            self._items[i] = item
+        return item
+
+    def __setitem__(self, i, value):
+        self._items[i] = value
+
+    def __delitem__(self, i):
+        del self._items[i]
+
+    def insert(self, i, value):
+        self._items.insert(i, value)
+
+    def copy(self):
+        return LazyClientList(self._items, self.trusted)
+
+    def client_id_at(self, i):
+        item = self._items[i]
+        if isinstance(item, tuple):
+            return item[0]
+        return None if item is None else item.client_id
+
+    def compact(self):
+        # удалённые репозиторием позиции хранятся как None до сжатия
+        self._items = [item for item in self._items if item is not None]
+
+    def iter_clients(self):
+        for item in self._items:
+            if item is None:
+                continue
+            if isinstance(item, tuple):
+                yield client_from_row(item, self.trusted)
+            else:
+                yield item
+
+    def iter_rows(self):
+        for item in list(self._items):
+            if isinstance(item, tuple):
+                yield item
+            elif item is not None:
+                yield tuple(getattr(item, field) for field in Client.FIELDS)
+
+    def materialized_count(self):
+        return sum(1 for item in self._items if item is not None and not isinstance(item, tuple))
+
+    def __repr__(self):
+        return f"LazyClientList(len={len(self._items)}, materialized={self.materialized_count()})"
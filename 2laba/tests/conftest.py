@@ -0,0 +1,5 @@
+import os
+import sys
+
+# модули репозитория импортируются как верхнеуровневые, как в скриптах и benchmarks
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,19 @@
+from cache import LRUCache
+
+
+def test_fill_after_a_concurrent_write_is_dropped():
+    cache = LRUCache(maxsize=4, ttl=60)
+    version = cache.version
+    assert cache.get(1) is None
+    cache.set(1, "новый")
+    assert not cache.fill(1, "старый", version)
+    assert cache.get(1) == "новый"
+
+    version = cache.version
+    cache.invalidate(1)
+    assert not cache.fill(1, "удалённый", version)
+    assert cache.get(1) is None
+
+    version = cache.version
+    assert cache.fill(1, "прочитанный", version)
+    assert cache.get(1) == "прочитанный"
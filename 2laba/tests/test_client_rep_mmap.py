@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from benchmarks.generator import new_client_records
+from client_rep_json import Client_rep_json
+from client_rep_mmap import HEADER_SIZE, ClientRepMMap
+
+
+def test_pages_skip_deleted_slots(tmp_path):
+    filename = str(tmp_path / "clients.mmap")
+    repo = ClientRepMMap(filename, initial_capacity=16, sync=False)
+    records = iter(new_client_records(200, start=1))
+    expected = []
+    rng = random.Random(0)
+    for step in range(300):
+        if rng.random() < 0.6 or not expected:
+            expected.append(repo.add_client(next(records)).client_id)
+        else:
+            client_id = rng.choice(expected)
+            expected.remove(client_id)
+            assert repo.delete_by_id(client_id)
+        page = rng.randint(1, 8)
+        assert [c.client_id for c in repo.get_k_n_short_list(page, 9)] == expected[(page - 1) * 9:page * 9]
+    repo.close()
+
+    repo = ClientRepMMap(filename, sync=False)
+    assert repo.get_count() == len(expected)
+    assert [c.client_id for c in repo.get_k_n_short_list(2, 9)] == expected[9:18]
+    repo.close()
+
+
+def test_truncated_or_foreign_file_is_rejected(tmp_path):
+    filename = str(tmp_path / "clients.mmap")
+    repo = ClientRepMMap(filename, initial_capacity=4, sync=False)
+    for record in new_client_records(3, start=1):
+        repo.add_client(record)
+    repo.close()
+
+    with open(filename, "rb") as f:
+        data = f.read()
+    for content in (data[:10], data[:HEADER_SIZE + 10], b"x" * len(data)):
+        with open(filename, "wb") as f:
+            f.write(content)
+        with pytest.raises(ValueError):
+            ClientRepMMap(filename)
+
+
+def test_lookups_and_search_match_the_file_repository(tmp_path):
+    records = new_client_records(100, start=1)
+    mmap_repo = ClientRepMMap(str(tmp_path / "clients.mmap"), sync=False)
+    json_repo = Client_rep_json(str(tmp_path / "clients.json"), durability="none")
+    for repo in (mmap_repo, json_repo):
+        for record in records:
+            repo.add_client(dict(record))
+        repo.delete_by_id(8)
+
+    for query in ("ив", "иванов ан", "нет такого"):
+        assert mmap_repo.search(query, 5) == json_repo.search(query, 5)
+    for record in records[5:10]:
+        assert mmap_repo.get_by_phone(record["phone"]) == json_repo.get_by_phone(record["phone"])
+    assert mmap_repo.get_by_phone(records[7]["phone"]) is None
+    mmap_repo.close()
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from benchmarks.generator import new_client_records
+from client_rep_json import Client_rep_json
+
+
+def test_group_commit_timer_does_not_write_an_open_batch(tmp_path):
+    filename = str(tmp_path / "clients.json")
+    records = new_client_records(2, start=1)
+    repo = Client_rep_json(filename, commit_delay=0.05)
+    repo.add_client(records[0])
+    with pytest.raises(RuntimeError):
+        with repo.batch():
+            repo.add_client(records[1])
+            time.sleep(0.2)
+            assert Client_rep_json(filename).get_count() == 0
+            raise RuntimeError
+    time.sleep(0.2)
+    assert not repo._writer.pending
+    assert repo.get_count() == 1
+    assert Client_rep_json(filename).get_count() == 1
+
+
+def test_failed_background_write_is_retried_and_reported(tmp_path, monkeypatch):
+    import durable_io
+
+    def disk_full(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    filename = str(tmp_path / "clients.json")
+    repo = Client_rep_json(filename, commit_delay=0.05)
+    atomic_write = durable_io.atomic_write
+    monkeypatch.setattr(durable_io, "atomic_write", disk_full)
+    repo.add_client(new_client_records(1, start=1)[0])
+    time.sleep(0.2)
+    assert repo._writer.pending
+    assert isinstance(repo._writer.error, OSError)
+    with pytest.raises(OSError):
+        repo.flush()
+
+    monkeypatch.setattr(durable_io, "atomic_write", atomic_write)
+    repo.close()
+    assert repo._writer.error is None
+    assert Client_rep_json(filename).get_count() == 1
@@ -0,0 +1,17 @@
+from benchmarks.generator import new_client_records
+from inheritance import BINARY_MAX_LENGTH, ClientRepBinary
+
+
+def test_binary_rejects_fields_that_collide_with_the_none_marker(tmp_path):
+    filename = str(tmp_path / "clients.bin")
+    first, second = new_client_records(2, start=1)
+    repo = ClientRepBinary(filename)
+    first["address"] = "д" * (BINARY_MAX_LENGTH // 2)
+    assert repo.add_client(first) is not None
+    second["address"] = "a" * (BINARY_MAX_LENGTH + 1)
+    assert repo.add_client(second) is None
+    assert repo.replace_by_id(1, second) is False
+
+    loaded = ClientRepBinary(filename)
+    assert loaded.get_count() == 1
+    assert loaded.get_by_id(1).address == first["address"]
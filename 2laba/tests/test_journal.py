@@ -0,0 +1,40 @@
+from benchmarks.generator import new_client_records
+from client_rep_json import Client_rep_json
+
+
+def open_repo(tmp_path):
+    return Client_rep_json(str(tmp_path / "clients.json"), journal=True, durability="none")
+
+
+def test_torn_tail_is_cut_off_before_new_appends(tmp_path):
+    repo = open_repo(tmp_path)
+    records = new_client_records(5, start=1)
+    for data in records[:3]:
+        repo.add_client(data)
+    with open(repo.journal.filename, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "client": {"client_id": 4, "last_')
+
+    repo = open_repo(tmp_path)
+    assert repo.get_count() == 3
+    assert repo.journal.dropped == 1
+    for data in records[3:]:
+        repo.add_client(data)
+
+    repo = open_repo(tmp_path)
+    assert repo.get_count() == 5
+    assert repo.journal.dropped == 0
+
+
+def test_records_after_a_torn_line_are_recovered(tmp_path):
+    # журналы, испорченные до исправления: обрывок посередине, за ним подтверждённые записи
+    repo = open_repo(tmp_path)
+    records = new_client_records(3, start=1)
+    repo.add_client(records[0])
+    with open(repo.journal.filename, "a", encoding="utf-8") as f:
+        f.write('{"op": "delete", "client_')
+    repo.add_client(records[1])
+    repo.add_client(records[2])
+
+    repo = open_repo(tmp_path)
+    assert [c.client_id for c in repo.iter_clients()] == [1, 3]
+    assert repo.journal.count == 2
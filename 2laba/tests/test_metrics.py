@@ -0,0 +1,19 @@
+from benchmarks.generator import new_client_records
+from client_rep_json import Client_rep_json
+from metrics import registry
+
+
+def test_load_and_flush_latencies_are_recorded(tmp_path):
+    filename = str(tmp_path / "clients.json")
+    registry.reset()
+    registry.enable()
+    try:
+        repo = Client_rep_json(filename, durability="none", commit_delay=0.01)
+        repo.add_clients(new_client_records(3, start=1))
+        repo.flush()
+        Client_rep_json(filename, durability="none")
+    finally:
+        registry.disable()
+    assert registry.histogram("Client_rep_json", "load").count == 2
+    assert registry.histogram("Client_rep_json", "flush").count >= 1
+    registry.reset()
@@ -0,0 +1,108 @@
+import json
+import random
+
+import pytest
+
+from benchmarks.generator import new_client_records
+from client_rep_json import Client_rep_json
+from client_rep_yaml import ClientRepYAML
+from inheritance import ClientRepBinary
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_pages_follow_insertion_order_after_deletes(tmp_path, lazy):
+    # удаление оставляет пустые позиции; страницы, счётчик и файл должны совпадать с обычным списком
+    filename = str(tmp_path / "clients.json")
+    repo = Client_rep_json(filename, durability="none")
+    repo.add_clients(new_client_records(50, start=1))
+    repo = Client_rep_json(filename, durability="none", lazy=lazy, journal=True)
+    expected = list(range(1, 51))
+    rng = random.Random(0)
+    records = iter(new_client_records(100, start=1000))
+
+    for step in range(120):
+        if rng.random() < 0.5:
+            expected.append(repo.add_client(next(records)).client_id)
+        elif expected:
+            client_id = rng.choice(expected)
+            expected.remove(client_id)
+            assert repo.delete_by_id(client_id)
+        if step % 10 == 0 and len(expected) > 3:
+            victims = rng.sample(expected, 3)
+            expected = [client_id for client_id in expected if client_id not in victims]
+            assert repo.delete_by_ids(victims + [10 ** 6]) == 3
+
+        assert repo.get_count() == len(expected)
+        page = rng.randint(1, 6)
+        assert [c.client_id for c in repo.get_k_n_short_list(page, 7)] == expected[(page - 1) * 7:page * 7]
+        if expected:
+            assert repo.get_by_id(expected[-1]).client_id == expected[-1]
+
+    assert [c.client_id for c in repo.iter_clients()] == expected
+    repo = Client_rep_json(filename, durability="none", lazy=lazy, journal=True)
+    assert [c.client_id for c in repo.iter_clients()] == expected
+    repo.compact()
+    assert [c.client_id for c in Client_rep_json(filename).iter_clients()] == expected
+
+
+def test_rolled_back_batch_restores_deleted_clients(tmp_path):
+    repo = Client_rep_json(str(tmp_path / "clients.json"), durability="none")
+    repo.add_clients(new_client_records(5, start=1))
+    repo.delete_by_id(2)
+    with pytest.raises(RuntimeError):
+        with repo.batch():
+            repo.delete_by_id(4)
+            repo.get_k_n_short_list(1, 10)
+            raise RuntimeError
+    assert [c.client_id for c in repo.get_k_n_short_list(1, 10)] == [1, 3, 4, 5]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("content, count, errors", [
+    ('{"a": 1}', 0, 0),
+    ('[1, 2]', 0, 2),
+    ('[null, {"client_id": 1}]', 0, 2),
+])
+def test_malformed_content_starts_empty_or_reports_records(tmp_path, lazy, content, count, errors):
+    filename = tmp_path / "clients.json"
+    filename.write_text(content, encoding="utf-8")
+    repo = Client_rep_json(str(filename), lazy=lazy)
+    assert repo.get_count() == count
+    assert len(repo.load_errors) == errors
+
+
+@pytest.mark.parametrize("repo_class, name", [(ClientRepYAML, "clients.yaml"), (ClientRepBinary, "clients.bin")])
+def test_lazy_load_round_trip(tmp_path, repo_class, name):
+    filename = str(tmp_path / name)
+    records = new_client_records(5, start=1)
+    repo_class(filename, durability="none").add_clients(records)
+
+    repo = repo_class(filename, durability="none", lazy=True)
+    assert repo.get_count() == 5
+    assert repo.get_by_id(3).phone == records[2]["phone"]
+
+
+def test_lazy_json_reports_numbers_split_across_chunks(tmp_path):
+    filename = tmp_path / "clients.json"
+    filename.write_text('[0.96354453588955, 12345]', encoding="utf-8")
+    repo = Client_rep_json(str(filename), lazy=True, chunk_size=1)
+    assert repo.get_count() == 0
+    assert [i for i, _ in repo.load_errors] == [0, 1]
+
+
+def test_shared_phone_in_an_old_file_keeps_both_holders(tmp_path):
+    filename = tmp_path / "clients.json"
+    first, second, third = new_client_records(3, start=1)
+    second["phone"] = first["phone"]
+    rows = [dict(record, client_id=i) for i, record in enumerate((first, second), 1)]
+    filename.write_text(json.dumps(rows, ensure_ascii=False), encoding="utf-8")
+    repo = Client_rep_json(str(filename), durability="none")
+
+    assert repo.replace_by_id(2, dict(second))
+    assert repo.delete_by_id(1)
+    assert repo.get_by_phone(first["phone"]).client_id == 2
+    third["phone"] = first["phone"]
+    with pytest.raises(ValueError):
+        repo.add_client(third)
+    assert repo.delete_by_id(2)
+    assert repo.add_client(third) is not None